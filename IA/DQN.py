@@ -71,6 +71,20 @@ def choose_action(Q_values, epsilon):
         return random.randint(0, len(Q_values) - 1)
     return int(np.argmax(Q_values))
 
+_rng = np.random.default_rng()
+
+def choose_actions(Q_values, epsilon, rng=None, out=None):
+    """
+    Epsilon-greedy vectorisé sur un batch d'environnements.
+    Q_values : (K, n_actions) ; epsilon : scalaire ou (K,)
+    Retourne les K actions (int64), écrites dans out si fourni.
+    """
+    rng = _rng if rng is None else rng
+    actions = np.argmax(Q_values, axis=1, out=out)
+    explore = rng.random(len(actions)) < epsilon
+    actions[explore] = rng.integers(0, Q_values.shape[1], int(explore.sum()))
+    return actions
+
 
 # ============================================================
 # 5) Replay Buffer
@@ -116,11 +130,13 @@ def compute_targets(params, rewards, next_states, dones, gamma):
 # 7) Backward : rétropropagation
 # ============================================================
 
-def backward(params, cache, actions, targets):
+def backward(params, cache, actions, targets, weights=None, return_td=False):
     """
     cache : (X, z1, h1, z2, h2)
     actions : (B,)
     targets : (B,)
+    weights : (B,) poids d'importance du replay priorisé (None = 1)
+    return_td : renvoie aussi diff, les erreurs TD (nouvelles priorités)
     """
 
     X, z1, h1, z2, h2 = cache
@@ -136,7 +152,10 @@ def backward(params, cache, actions, targets):
 
     # Gradient Q-layer
     dq = np.zeros_like(q_pred)
-    dq[np.arange(batch_size), actions] = diff * 2.0 / batch_size
+    if weights is None:
+        dq[np.arange(batch_size), actions] = diff * 2.0 / batch_size
+    else:
+        dq[np.arange(batch_size), actions] = weights * diff * 2.0 / batch_size
 
     # --------------------------------------------------------
     # dW3, db3
@@ -167,6 +186,8 @@ def backward(params, cache, actions, targets):
         "W2": dW2, "b2": db2,
         "W3": dW3, "b3": db3
     }
+    if return_td:
+        return grads, diff
     return grads
 
 
@@ -185,4 +206,266 @@ def update_params(params, grads, lr):
     # ---------------------------------
     
     for key in params.keys():
-        params[key] -= lr * grads[key]
\ No newline at end of file
+        params[key] -= lr * grads[key]
+
+# ============================================================
+# 9) Réseau float32 à buffers préalloués
+# ============================================================
+#
+# Même réseau que les fonctions ci-dessus (mêmes clés W1..b3, même
+# perte, même clipping par tenseur), mais :
+#   - paramètres en float32 : les matmuls sur W1 (128 × 28224) ne
+#     passent plus en float64 ;
+#   - activations, gradients et erreurs TD écrits dans des buffers
+#     réutilisés (un jeu de buffers par taille de batch rencontrée),
+#     avec des matmuls out= et des ReLU / masques sur place : un pas
+#     d'apprentissage n'alloue plus rien une fois les buffers créés.
+#
+# Les tableaux renvoyés (Q, gradients, erreurs TD) sont des vues sur ces
+# buffers, valables jusqu'à l'appel suivant.
+
+class QNetwork:
+
+    KEYS = ("W1", "b1", "W2", "b2", "W3", "b3")
+
+    def __init__(self, input_dim, hidden1=128, hidden2=64, output_dim=2, params=None):
+        """
+        params : dict W1..b3 existant (ex. init_network ou np.load),
+                 converti en float32 ; None -> init_network
+        """
+        if params is None:
+            params = init_network(input_dim, hidden1, hidden2, output_dim)
+        self.params = {k: np.ascontiguousarray(params[k], dtype=np.float32) for k in self.KEYS}
+        self.input_dim = input_dim
+        self.grads = {k: np.zeros_like(v) for k, v in self.params.items()}
+        self._workspaces = {}
+        self._inputs = {}    # entrées (2B, input_dim) de train_step
+        self._ws = None      # buffers du dernier forward
+        self._X = None       # entrée du dernier forward
+
+    @classmethod
+    def from_params(cls, params):
+        hidden1, input_dim = params["W1"].shape
+        output_dim, hidden2 = params["W3"].shape
+        return cls(input_dim, hidden1, hidden2, output_dim, params=params)
+
+    def _workspace(self, batch_size):
+        ws = self._workspaces.get(batch_size)
+        if ws is None:
+            h1 = self.params["W1"].shape[0]
+            h2 = self.params["W2"].shape[0]
+            out = self.params["W3"].shape[0]
+            f32 = np.float32
+            ws = {
+                "z1": np.empty((batch_size, h1), f32), "h1": np.empty((batch_size, h1), f32),
+                "z2": np.empty((batch_size, h2), f32), "h2": np.empty((batch_size, h2), f32),
+                "q": np.empty((batch_size, out), f32), "dq": np.empty((batch_size, out), f32),
+                "dh1": np.empty((batch_size, h1), f32), "dh2": np.empty((batch_size, h2), f32),
+                "off1": np.empty((batch_size, h1), np.bool_),
+                "off2": np.empty((batch_size, h2), np.bool_),
+                "td": np.empty(batch_size, f32), "g": np.empty(batch_size, f32),
+                "y": np.empty(batch_size, f32), "qmax": np.empty(batch_size, f32),
+                "rows": np.arange(batch_size) * out,
+                "flat": np.empty(batch_size, np.int64),
+            }
+            self._workspaces[batch_size] = ws
+        return ws
+
+    def forward(self, X):
+        """
+        X : (input_dim,) ou (batch_size, input_dim), float32 de préférence
+        Retourne Q (batch_size, output_dim), vue sur un buffer interne.
+        """
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        p = self.params
+        ws = self._workspace(X.shape[0])
+
+        z1, h1, z2, h2, q = ws["z1"], ws["h1"], ws["z2"], ws["h2"], ws["q"]
+        np.matmul(X, p["W1"].T, out=z1)
+        z1 += p["b1"]
+        np.maximum(z1, 0, out=h1)
+        np.matmul(h1, p["W2"].T, out=z2)
+        z2 += p["b2"]
+        np.maximum(z2, 0, out=h2)
+        np.matmul(h2, p["W3"].T, out=q)
+        q += p["b3"]
+
+        self._ws, self._X = ws, X
+        return q
+
+    def compute_targets(self, rewards, next_states, dones, gamma, target=None, double=False):
+        """
+        y = r + gamma * (1 - done) * V(s'), dans un buffer interne, avec
+            V(s') = max_a' Q(s', a')                   target None
+            V(s') = max_a' Q_target(s', a')            target fourni
+            V(s') = Q_target(s', argmax_a' Q(s', a'))  double=True (Double DQN)
+        """
+        batch_size = len(rewards)
+        if target is None or double:
+            q_next = self.forward(next_states)
+        else:
+            q_next = None
+        ws = self._workspace(batch_size)
+        y, qmax = ws["y"], ws["qmax"]
+        self._next_values(q_next, next_states, target, ws, qmax)
+        np.subtract(1, dones, out=y)
+        y *= gamma
+        y *= qmax
+        y += rewards
+        return y
+
+    def _next_values(self, q_next, next_states, target, ws, out):
+        """V(s') dans out (voir compute_targets) ; q_next = Q(s', .) du réseau courant."""
+        if target is None:
+            np.max(q_next, axis=1, out=out)
+            return
+        q_target = target.forward(next_states)
+        if q_next is None:
+            np.max(q_target, axis=1, out=out)
+            return
+        # Double DQN : action choisie par le réseau courant, évaluée par la cible
+        batch_size = len(out)
+        best = ws["flat"][-batch_size:]
+        np.argmax(q_next, axis=1, out=best)
+        best += ws["rows"][:batch_size]
+        np.take(q_target, best, out=out)
+
+    def backward(self, actions, targets, weights=None):
+        """
+        Gradients de la perte du dernier forward (même perte que backward()),
+        calculés sur ses len(actions) premières lignes : le reste du batch
+        (ex. les next_states de train_step) ne reçoit pas de gradient.
+        Retourne (grads, td) : td = diff, l'erreur TD sur les actions prises.
+        """
+        ws, p, g = self._ws, self.params, self.grads
+        batch_size = len(actions)
+        X = self._X[:batch_size]
+        # vues sur les batch_size premières lignes des buffers
+        q, dq, td, flat, coef, rows = (ws[k][:batch_size] for k in ("q", "dq", "td", "flat", "g", "rows"))
+        h1, z1, dh1, off1 = (ws[k][:batch_size] for k in ("h1", "z1", "dh1", "off1"))
+        h2, z2, dh2, off2 = (ws[k][:batch_size] for k in ("h2", "z2", "dh2", "off2"))
+
+        # diff = Q(s, a) - y, lu à plat dans q
+        np.add(rows, actions, out=flat)
+        np.take(q, flat, out=td)
+        td -= targets
+
+        # dq : nul sauf sur les actions prises
+        np.multiply(td, 2.0 / batch_size, out=coef)
+        if weights is not None:
+            coef *= weights
+        dq.fill(0)
+        np.put(dq, flat, coef)
+
+        np.matmul(dq.T, h2, out=g["W3"])
+        np.sum(dq, axis=0, out=g["b3"])
+
+        dz2 = np.matmul(dq, p["W3"], out=dh2)
+        np.less_equal(z2, 0, out=off2)
+        np.copyto(dz2, 0, where=off2)
+        np.matmul(dz2.T, h1, out=g["W2"])
+        np.sum(dz2, axis=0, out=g["b2"])
+
+        dz1 = np.matmul(dz2, p["W2"], out=dh1)
+        np.less_equal(z1, 0, out=off1)
+        np.copyto(dz1, 0, where=off1)
+        np.matmul(dz1.T, X, out=g["W1"])
+        np.sum(dz1, axis=0, out=g["b1"])
+
+        return g, td
+
+    def batch_buffers(self, batch_size):
+        """
+        (states, next_states) : moitiés d'un même buffer (2 × batch_size,
+        input_dim). Un batch échantillonné directement dedans passe dans
+        train_step sans être recopié.
+        """
+        X = self._inputs.get(batch_size)
+        if X is None:
+            X = np.empty((2 * batch_size, self.input_dim), dtype=np.float32)
+            self._inputs[batch_size] = X
+        return X[:batch_size], X[batch_size:]
+
+    def train_step(self, batch, gamma, lr, weights=None, max_norm=1.0,
+                   target=None, double=False, optimizer=None):
+        """
+        Pas d'apprentissage complet sur batch = (states, actions, rewards,
+        next_states, dones) : un seul forward sur les 2 × B états, cibles
+        tirées des Q de la seconde moitié, backward sur la première moitié,
+        mise à jour sur place.
+
+        target / double : réseau cible et Double DQN, comme compute_targets.
+        Avec un réseau cible seul, Q(s', .) du réseau courant est inutile :
+        le forward courant ne porte que sur les B états.
+        optimizer : optimiseur de IA/optimizers.py construit sur self.params ;
+        remplace alors update(lr, max_norm).
+
+        Retourne td (erreurs TD, pour update_priorities).
+        """
+        states, actions, rewards, next_states, dones = batch
+        batch_size = len(actions)
+
+        # states et next_states consécutifs en mémoire -> aucune copie
+        first, second = self.batch_buffers(batch_size)
+        X = self._inputs[batch_size]
+        if not (states.ctypes.data == first.ctypes.data
+                and next_states.ctypes.data == second.ctypes.data):
+            np.copyto(first, states.reshape(batch_size, -1))
+            np.copyto(second, next_states.reshape(batch_size, -1))
+
+        if target is None or double:
+            q = self.forward(X)
+            q_next = q[batch_size:]
+        else:
+            self.forward(first)
+            q_next = None
+        ws = self._ws
+        y, qmax = ws["y"][:batch_size], ws["qmax"][:batch_size]
+        self._next_values(q_next, second, target, ws, qmax)
+        np.subtract(1, dones, out=y)
+        y *= gamma
+        y *= qmax
+        y += rewards
+
+        grads, td = self.backward(actions, y, weights)
+        if optimizer is None:
+            self.update(lr, max_norm)
+        else:
+            optimizer.step(grads)
+        return td
+
+    # --------------------------------------------------------
+    # Réseau cible
+    # --------------------------------------------------------
+
+    def clone(self):
+        """Copie indépendante (paramètres recopiés), ex. réseau cible."""
+        return QNetwork(self.input_dim, params={k: v.copy() for k, v in self.params.items()})
+
+    def sync_from(self, other, tau=1.0):
+        """
+        Rapproche les paramètres de ceux de other, sur place :
+        tau = 1 -> copie (np.copyto), sinon moyenne de Polyak
+        p <- (1 - tau) p + tau p_other. Les buffers de gradient, inutiles
+        pour un réseau cible, servent de tampon : aucune allocation.
+        """
+        for key in self.KEYS:
+            p, q = self.params[key], other.params[key]
+            if tau == 1.0:
+                np.copyto(p, q)
+            else:
+                tmp = self.grads[key]
+                np.multiply(q, np.float32(tau), out=tmp)
+                p *= np.float32(1.0 - tau)
+                p += tmp
+
+    def update(self, lr, max_norm=1.0):
+        """Descente de gradient sur place, clipping par tenseur comme update_params."""
+        for key in self.KEYS:
+            grad = self.grads[key]
+            norm = np.sqrt(np.vdot(grad, grad))
+            scale = lr * max_norm / norm if norm > max_norm else lr
+            grad *= np.float32(scale)
+            self.params[key] -= grad
@@ -1,4 +1,5 @@
 import random
+import numpy as np
 
 class QLearningAgent:
     def __init__(self, actions, alpha=0.1, gamma=0.99, epsilon=1.0, epsilon_decay=0.995, epsilon_min=0.01, jump_probability=0.1):
@@ -44,4 +45,116 @@ class QLearningAgent:
 
     def update_epsilon(self):
         if self.epsilon > self.epsilon_min:
-            self.epsilon = max(self.epsilon_min, self.epsilon * self.epsilon_decay)
\ No newline at end of file
+            self.epsilon = max(self.epsilon_min, self.epsilon * self.epsilon_decay)
+
+# ============================================================
+# Variante à table dense : états discrétisés -> indices entiers
+# ============================================================
+#
+# Chaque composante de l'état est rangée dans un intervalle (bords
+# donnés par feature), et les numéros d'intervalles sont combinés en un
+# seul indice en base mixte : index = sum(b_f * stride_f). La table Q
+# est un tableau (n_states, n_actions), toutes les opérations prennent
+# des tableaux d'états.
+
+
+class StateDiscretizer:
+
+    def __init__(self, edges):
+        """
+        edges : une liste de bords croissants par composante de l'état ;
+                la composante f a len(edges[f]) + 1 intervalles
+        """
+        self.edges = [np.asarray(e, dtype=np.float64) for e in edges]
+        self.radix = np.array([len(e) + 1 for e in self.edges], dtype=np.int64)
+        self.strides = np.concatenate([np.cumprod(self.radix[::-1])[::-1][1:], [1]])
+        self.n_states = int(np.prod(self.radix))
+
+    @classmethod
+    def uniform(cls, low, high, bins):
+        """bins intervalles réguliers entre low et high pour chaque composante (+ 2 hors bornes)."""
+        bins = np.broadcast_to(bins, np.shape(low))
+        return cls([np.linspace(lo, hi, n + 1) for lo, hi, n in zip(low, high, bins)])
+
+    def encode(self, states, out=None):
+        """États (N, F) -> indices (N,) ; un état seul (F,) -> indice entier."""
+        states = np.asarray(states)
+        if states.ndim == 1:
+            return int(self.encode(states[None])[0])
+        if out is None:
+            out = np.empty(len(states), dtype=np.int64)
+        out.fill(0)
+        for f, edges in enumerate(self.edges):
+            out += np.searchsorted(edges, states[:, f], side="right") * self.strides[f]
+        return out
+
+
+class ArrayQLearningAgent(QLearningAgent):
+    """
+    Même agent que QLearningAgent (mêmes actions, même exploration), mais
+    Q-values dans un tableau dense indexé par l'état discrétisé.
+    """
+
+    def __init__(self, actions, discretizer, alpha=0.1, gamma=0.99, epsilon=1.0,
+                 epsilon_decay=0.995, epsilon_min=0.01, jump_probability=0.1, seed=None):
+        super().__init__(actions, alpha, gamma, epsilon, epsilon_decay, epsilon_min, jump_probability)
+        self.discretizer = discretizer
+        self.q_table = np.zeros((discretizer.n_states, len(actions)), dtype=np.float64)
+        self.action_index = {a: i for i, a in enumerate(actions)}
+        self.rng = np.random.default_rng(seed)
+
+        # loi de l'action aléatoire (sauter moins souvent, comme choose_action)
+        n = len(actions)
+        if "sauter" in actions and n > 1:
+            self.explore_p = np.full(n, (1 - jump_probability) / (n - 1))
+            self.explore_p[self.action_index["sauter"]] = jump_probability
+        else:
+            self.explore_p = np.full(n, 1 / n)
+
+    def get_q(self, state, action):
+        return self.q_table[self.discretizer.encode(state), self.action_index[action]]
+
+    def choose_action(self, state, explore=True):
+        index = self.choose_actions(np.asarray(state)[None], explore)[0]
+        return self.actions[index]
+
+    def choose_actions(self, states, explore=True):
+        """Indices d'actions (N,) pour un tableau d'états (N, F)."""
+        q = self.q_table[self.discretizer.encode(states)]
+        # argmax avec départage aléatoire des ex aequo
+        ties = q == q.max(axis=1, keepdims=True)
+        actions = np.argmax(ties * self.rng.random(q.shape), axis=1)
+        if explore:
+            random_rows = self.rng.random(len(actions)) < self.epsilon
+            n_random = int(random_rows.sum())
+            if n_random:
+                actions[random_rows] = self.rng.choice(len(self.actions), n_random, p=self.explore_p)
+        return actions
+
+    def learn(self, state, action, reward, next_state):
+        self.learn_batch(np.asarray(state)[None], np.array([self.action_index[action]]),
+                         np.array([reward]), np.asarray(next_state)[None])
+
+    def learn_batch(self, states, actions, rewards, next_states, dones=None):
+        """
+        Mise à jour sur un tableau de transitions (indices d'actions).
+
+        Toutes les cibles sont calculées avec la table d'avant le batch ;
+        les corrections d'une même paire (état, action) s'additionnent.
+        dones (optionnel) : pas de bootstrap après une transition finale.
+        epsilon décroît d'un pas par transition, comme avec learn.
+        """
+        s = self.discretizer.encode(states)
+        s_next = self.discretizer.encode(next_states)
+        target = self.q_table[s_next].max(axis=1)
+        if dones is not None:
+            target *= ~np.asarray(dones, dtype=bool)
+        target *= self.gamma
+        target += rewards
+        flat = s * len(self.actions) + actions
+        target -= self.q_table.ravel()[flat]
+        target *= self.alpha
+        np.add.at(self.q_table.ravel(), flat, target)
+
+        if self.epsilon > self.epsilon_min:
+            self.epsilon = max(self.epsilon_min, self.epsilon * self.epsilon_decay ** len(s))
@@ -0,0 +1,179 @@
+import os
+import json
+import mmap
+import queue
+import struct
+import threading
+import numpy as np
+
+# ============================================================
+# Format de checkpoint : en-tête JSON + tableaux bruts alignés
+# ============================================================
+#
+#   MAGIC (8 octets) | longueur de l'en-tête (uint64) | en-tête JSON
+#   | tableaux bruts, chacun aligné sur ALIGN octets
+#
+# L'en-tête donne, pour chaque tableau, dtype, shape et position, plus
+# un dictionnaire meta libre (scalaires, états des générateurs...).
+# Au chargement, le fichier est projeté en mémoire (mmap) une seule
+# fois : les tableaux sont des vues dessus, sans copie ni unpickling.
+#
+# Les noms sont "plats" : "params/W1", "opt/m/W1", ...
+
+MAGIC = b"GDCKPT01"
+ALIGN = 64
+
+
+def _align(n):
+    return (n + ALIGN - 1) // ALIGN * ALIGN
+
+
+def save_checkpoint(path, arrays, meta=None):
+    """
+    Ecrit arrays (dict nom -> tableau) et meta (sérialisable en JSON)
+    dans path. Le fichier est écrit à côté puis renommé : un crash en
+    cours d'écriture laisse le checkpoint précédent intact.
+    """
+    layout = {}
+    size = 0
+    for name, array in arrays.items():
+        size = _align(size)
+        layout[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": size}
+        size += array.nbytes
+    header = json.dumps({"arrays": layout, "meta": meta or {}}).encode()
+    data_start = _align(len(MAGIC) + 8 + len(header))
+
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<Q", len(header)))
+        f.write(header)
+        for name, array in arrays.items():
+            f.seek(data_start + layout[name]["offset"])
+            f.write(np.ascontiguousarray(array).reshape(-1).view(np.uint8))
+        f.truncate(data_start + size)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def load_checkpoint(path, mmap_mode="r"):
+    """
+    Retourne (arrays, meta).
+
+    mmap_mode : "r" -> vues en lecture seule sur le fichier projeté
+                "c" -> vues modifiables, copie à l'écriture (le fichier
+                       n'est jamais modifié)
+                None -> tableaux lus en mémoire
+    """
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} n'est pas un checkpoint")
+        (length,) = struct.unpack("<Q", f.read(8))
+        header = json.loads(f.read(length))
+        data_start = _align(len(MAGIC) + 8 + length)
+        if mmap_mode is None:
+            f.seek(0)
+            buffer = bytearray(f.read())
+        else:
+            access = mmap.ACCESS_READ if mmap_mode == "r" else mmap.ACCESS_COPY
+            buffer = mmap.mmap(f.fileno(), 0, access=access)
+
+    arrays = {}
+    for name, spec in header["arrays"].items():
+        dtype = np.dtype(spec["dtype"])
+        shape = tuple(spec["shape"])
+        count = int(np.prod(shape))
+        if count == 0:
+            arrays[name] = np.empty(shape, dtype=dtype)
+            continue
+        arrays[name] = np.frombuffer(buffer, dtype=dtype, count=count,
+                                     offset=data_start + spec["offset"]).reshape(shape)
+    return arrays, header["meta"]
+
+
+def subset(arrays, prefix):
+    """Tableaux dont le nom commence par prefix + "/", clés sans le préfixe."""
+    prefix = prefix + "/"
+    return {k[len(prefix):]: v for k, v in arrays.items() if k.startswith(prefix)}
+
+
+def prefixed(prefix, arrays):
+    return {f"{prefix}/{k}": v for k, v in arrays.items()}
+
+
+def load_params(path, mmap_mode="r"):
+    """
+    Paramètres d'un réseau : checkpoint (clés "params/...", sans copie)
+    ou ancien fichier np.save d'un dict (unpickling).
+    """
+    if path.endswith(".npy"):
+        return np.load(path, allow_pickle=True).item()
+    arrays, _ = load_checkpoint(path, mmap_mode)
+    return subset(arrays, "params")
+
+
+# ============================================================
+# Ecriture en arrière-plan
+# ============================================================
+#
+# submit() recopie les tableaux dans des buffers réutilisés (la seule
+# partie faite par la boucle d'entraînement), puis un thread écrit le
+# fichier. Si l'écriture précédente n'est pas finie, le checkpoint est
+# sauté plutôt que d'attendre le disque.
+
+
+class CheckpointWriter:
+
+    def __init__(self, path):
+        self.path = path
+        self._buffers = {}
+        self._idle = threading.Event()
+        self._idle.set()
+        self._queue = queue.Queue(maxsize=1)
+        self._error = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, arrays, meta=None):
+        """Programme l'écriture de arrays / meta. Retourne False si sauté."""
+        self._raise_error()
+        if not self._idle.is_set():
+            return False
+        for name, array in arrays.items():
+            buffer = self._buffers.get(name)
+            if buffer is None or buffer.shape != array.shape or buffer.dtype != array.dtype:
+                buffer = self._buffers[name] = np.empty_like(array)
+            np.copyto(buffer, array)
+        for name in self._buffers.keys() - arrays.keys():
+            del self._buffers[name]
+        self._idle.clear()
+        self._queue.put(json.loads(json.dumps(meta or {})))   # copie de meta
+        return True
+
+    def _run(self):
+        while True:
+            meta = self._queue.get()
+            if meta is None:
+                return
+            try:
+                save_checkpoint(self.path, self._buffers, meta)
+            except Exception as error:
+                self._error = error
+            finally:
+                self._idle.set()
+
+    def wait(self):
+        """Attend la fin de l'écriture en cours."""
+        self._idle.wait()
+        self._raise_error()
+
+    def close(self):
+        self.wait()
+        self._queue.put(None)
+        self._thread.join()
+
+    def _raise_error(self):
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
@@ -0,0 +1,259 @@
+import numpy as np
+from numpy.lib.stride_tricks import as_strided
+
+from .DQN import QNetwork
+
+# ============================================================
+# Q-network convolutif (NumPy, im2col)
+# ============================================================
+#
+# Architecture du DQN de Mnih et al. (2013), réduite :
+#   conv 8×8 stride 4 -> ReLU -> conv 4×4 stride 2 -> ReLU
+#   -> dense hidden -> ReLU -> dense output_dim
+# Pour (4, 84, 84) : 20×20×16 puis 9×9×32, soit ~0.67 M paramètres au
+# lieu de 3.6 M pour le W1 dense.
+#
+# Chaque convolution est un seul matmul BLAS :
+#   - conv 2 : les fenêtres de h1 sont lues par une vue as_strided (sans
+#     copie) puis rangées dans une matrice im2col préallouée (une ligne
+#     par position de sortie) ;
+#   - conv 1 (la plus coûteuse, noyau multiple du stride) : l'entrée est
+#     découpée en blocs stride × stride ("space to depth", 4× moins de
+#     données à recopier qu'un im2col, les fenêtres se chevauchant), un
+#     matmul calcule la contribution de chaque bloc aux m × m positions
+#     de noyau qui le couvrent (m = noyau / stride), puis m² additions
+#     décalées donnent la sortie.
+# Les activations des convolutions sont en NHWC, (B·OH·OW, F), ce qui
+# rend les lignes d'un même état contiguës.
+#
+# Même API que QNetwork (forward, backward, train_step, compute_targets,
+# clone, sync_from, update) : le reste est hérité tel quel.
+
+
+def conv_output_size(size, kernel, stride):
+    return (size - kernel) // stride + 1
+
+
+def windows(x, kernel, stride):
+    """
+    Vue (B, OH, OW, KH, KW, C) des fenêtres kernel × kernel de x (NHWC),
+    sans copie.
+    """
+    b, h, w, c = x.shape
+    sb, sh, sw, sc = x.strides
+    shape = (b, conv_output_size(h, kernel, stride), conv_output_size(w, kernel, stride),
+             kernel, kernel, c)
+    strides = (sb, sh * stride, sw * stride, sh, sw, sc)
+    return as_strided(x, shape=shape, strides=strides, writeable=False)
+
+
+class ConvQNetwork(QNetwork):
+
+    KEYS = ("W1", "b1", "W2", "b2", "W3", "b3", "W4", "b4")
+
+    def __init__(self, input_shape, channels=(16, 32), hidden=256, output_dim=2,
+                 kernels=(8, 4), strides=(4, 2), params=None, seed=None):
+        """
+        input_shape : shape d'un état, ex (4, 84, 84) ou (16, 84, 84)
+        params      : dict W1..b4 existant (ex. np.load), sinon init de He
+        """
+        self.input_shape = tuple(input_shape)
+        input_dim = int(np.prod(self.input_shape))
+        self.channels = channels
+        self.kernels = kernels
+        self.strides = strides
+
+        c, h, w = self.input_shape
+        if kernels[0] % strides[0] or h % strides[0] or w % strides[0]:
+            raise ValueError("conv 1 : noyau et taille d'entrée doivent être multiples du stride")
+        h1, w1 = (conv_output_size(s, kernels[0], strides[0]) for s in (h, w))
+        h2, w2 = (conv_output_size(s, kernels[1], strides[1]) for s in (h1, w1))
+        self.conv_shapes = ((h1, w1, channels[0]), (h2, w2, channels[1]))
+
+        if params is None:
+            rng = np.random.default_rng(seed)
+            fan_in = {
+                "W1": (channels[0], c * kernels[0] ** 2),
+                "W2": (channels[1], kernels[1] ** 2 * channels[0]),
+                "W3": (hidden, h2 * w2 * channels[1]),
+                "W4": (output_dim, hidden),
+            }
+            params = {}
+            for i, (key, shape) in enumerate(fan_in.items(), start=1):
+                params[key] = rng.standard_normal(shape) * np.sqrt(2. / shape[1])
+                params[f"b{i}"] = np.zeros(shape[0])
+        super().__init__(input_dim, params=params)
+
+        # W1 rangé pour le calcul par blocs : (C·s·s, m·m·F), et son gradient
+        s, m = strides[0], kernels[0] // strides[0]
+        self._m1 = m
+        self._w1_blocks = np.empty((c * s * s, m * m * channels[0]), np.float32)
+        self._gw1_blocks = np.empty_like(self._w1_blocks)
+
+    def _w1_layout(self, w1):
+        """Vue (C, s, s, m, m, F) d'un tableau de la shape de W1 (F, C·KH·KW)."""
+        c, s, m = self.input_shape[0], self.strides[0], self._m1
+        f = w1.shape[0]
+        return w1.reshape(f, c, m, s, m, s).transpose(1, 3, 5, 2, 4, 0)
+
+    def clone(self):
+        return ConvQNetwork(self.input_shape, self.channels, kernels=self.kernels,
+                            strides=self.strides,
+                            params={k: v.copy() for k, v in self.params.items()})
+
+    def _workspace(self, batch_size):
+        ws = self._workspaces.get(batch_size)
+        if ws is None:
+            (h1, w1, f1), (h2, w2, f2) = self.conv_shapes
+            n1, n2 = batch_size * h1 * w1, batch_size * h2 * w2
+            hidden = self.params["W3"].shape[0]
+            out = self.params["W4"].shape[0]
+            f32 = np.float32
+            c, h, w = self.input_shape
+            nb = batch_size * (h // self.strides[0]) * (w // self.strides[0])
+            ws = {"rows": np.arange(batch_size) * out, "flat": np.empty(batch_size, np.int64)}
+            for name, shape in (
+                ("blocks", (nb, self._w1_blocks.shape[0])),
+                ("Z1", (nb, self._w1_blocks.shape[1])), ("dZ1", (nb, self._w1_blocks.shape[1])),
+                ("cols2", (n2, self.params["W2"].shape[1])),
+                ("z1", (n1, f1)), ("h1", (n1, f1)), ("dh1", (n1, f1)),
+                ("z2", (n2, f2)), ("h2", (n2, f2)), ("dh2", (n2, f2)), ("dcols2", (n2, self.params["W2"].shape[1])),
+                ("z3", (batch_size, hidden)), ("h3", (batch_size, hidden)), ("dh3", (batch_size, hidden)),
+                ("q", (batch_size, out)), ("dq", (batch_size, out)),
+                ("td", (batch_size,)), ("g", (batch_size,)), ("y", (batch_size,)), ("qmax", (batch_size,)),
+            ):
+                ws[name] = np.empty(shape, f32)
+            for name in ("on1", "on2", "on3"):
+                ws[name] = np.empty(ws["z" + name[-1]].shape, np.bool_)
+            self._workspaces[batch_size] = ws
+        return ws
+
+    def forward(self, X):
+        """
+        X : (input_dim,), (B, input_dim) ou (B, C, H, W), float32 de préférence
+        Retourne Q (B, output_dim), vue sur un buffer interne.
+        """
+        X = np.asarray(X, dtype=np.float32).reshape((-1,) + self.input_shape)
+        batch_size = X.shape[0]
+        p = self.params
+        ws = self._workspace(batch_size)
+        (h1, w1, f1), _ = self.conv_shapes
+
+        # conv 1 : blocs s × s de l'entrée NCHW, (B·Hb·Wb, C·s·s)
+        c, h, w = self.input_shape
+        s, m = self.strides[0], self._m1
+        hb, wb = h // s, w // s
+        blocks = ws["blocks"].reshape(batch_size, hb, wb, c, s, s)
+        src = X.reshape(batch_size, c, hb, s, wb, s).transpose(0, 2, 4, 1, 3, 5)
+        if X.flags.c_contiguous:
+            # les s floats d'une ligne de bloc, contigus des deux côtés, sont
+            # copiés comme un seul élément (void de 4·s octets) : 4× moins
+            # d'éléments à déplacer dans la transposition
+            row = np.dtype((np.void, 4 * s))
+            blocks = blocks.view(row)[..., 0]
+            src = X.view(row).reshape(batch_size, c, hb, s, wb).transpose(0, 2, 4, 1, 3)
+        np.copyto(blocks, src)
+        np.copyto(self._w1_blocks.reshape(c, s, s, m, m, f1), self._w1_layout(p["W1"]))
+        np.matmul(ws["blocks"], self._w1_blocks, out=ws["Z1"])
+        # z1[i, j] = somme des contributions des blocs (i + di, j + dj)
+        Z1 = ws["Z1"].reshape(batch_size, hb, wb, m, m, f1)
+        z1 = ws["z1"].reshape(batch_size, h1, w1, f1)
+        np.copyto(z1, p["b1"])
+        for di in range(m):
+            for dj in range(m):
+                z1 += Z1[:, di:di + h1, dj:dj + w1, di, dj]
+        np.maximum(ws["z1"], 0, out=ws["h1"])
+
+        # conv 2 : im2col depuis h1 en NHWC
+        h1_nhwc = ws["h1"].reshape(batch_size, h1, w1, f1)
+        win2 = windows(h1_nhwc, self.kernels[1], self.strides[1])
+        np.copyto(ws["cols2"].reshape(win2.shape), win2)
+        np.matmul(ws["cols2"], p["W2"].T, out=ws["z2"])
+        ws["z2"] += p["b2"]
+        np.maximum(ws["z2"], 0, out=ws["h2"])
+
+        # couches denses sur h2 aplati (vue : lignes d'un état contiguës)
+        flat2 = ws["h2"].reshape(batch_size, -1)
+        np.matmul(flat2, p["W3"].T, out=ws["z3"])
+        ws["z3"] += p["b3"]
+        np.maximum(ws["z3"], 0, out=ws["h3"])
+        q = ws["q"]
+        np.matmul(ws["h3"], p["W4"].T, out=q)
+        q += p["b4"]
+
+        self._ws, self._X = ws, X
+        return q
+
+    def backward(self, actions, targets, weights=None):
+        """
+        Gradients de la perte du dernier forward sur ses len(actions)
+        premiers états (voir QNetwork.backward). Retourne (grads, td).
+        """
+        ws, p, g = self._ws, self.params, self.grads
+        batch_size = len(actions)
+        (h1, w1, f1), (h2, w2, f2) = self.conv_shapes
+        n1, n2 = batch_size * h1 * w1, batch_size * h2 * w2
+
+        q, dq, td, flat, coef, rows = (ws[k][:batch_size] for k in ("q", "dq", "td", "flat", "g", "rows"))
+        h3, z3, dh3, on3 = (ws[k][:batch_size] for k in ("h3", "z3", "dh3", "on3"))
+        h2_, z2, dh2, on2, cols2, dcols2 = (ws[k][:n2] for k in ("h2", "z2", "dh2", "on2", "cols2", "dcols2"))
+        z1, dh1, on1 = (ws[k][:n1] for k in ("z1", "dh1", "on1"))
+
+        # diff = Q(s, a) - y, puis dq nul sauf sur les actions prises
+        np.add(rows, actions, out=flat)
+        np.take(q, flat, out=td)
+        td -= targets
+        np.multiply(td, 2.0 / batch_size, out=coef)
+        if weights is not None:
+            coef *= weights
+        dq.fill(0)
+        np.put(dq, flat, coef)
+
+        # couches denses
+        np.matmul(dq.T, h3, out=g["W4"])
+        np.sum(dq, axis=0, out=g["b4"])
+        # ReLU : gradient multiplié par le masque z > 0 (un copyto where=
+        # sur un masque aléatoire coûte ~20× plus cher)
+        dz3 = np.matmul(dq, p["W4"], out=dh3)
+        np.greater(z3, 0, out=on3)
+        dz3 *= on3
+        np.matmul(dz3.T, h2_.reshape(batch_size, -1), out=g["W3"])
+        np.sum(dz3, axis=0, out=g["b3"])
+
+        # conv 2
+        dz2 = dh2.reshape(batch_size, -1)
+        np.matmul(dz3, p["W3"], out=dz2)
+        np.greater(z2, 0, out=on2)
+        dh2 *= on2
+        np.matmul(dh2.T, cols2, out=g["W2"])
+        np.sum(dh2, axis=0, out=g["b2"])
+
+        # col2im : chaque position du noyau ajoute sa contribution à dh1
+        np.matmul(dh2, p["W2"], out=dcols2)
+        k, s = self.kernels[1], self.strides[1]
+        dcols = dcols2.reshape(batch_size, h2, w2, k, k, f1)
+        dh1_nhwc = dh1.reshape(batch_size, h1, w1, f1)
+        dh1.fill(0)
+        for i in range(k):
+            for j in range(k):
+                dh1_nhwc[:, i:i + s * h2:s, j:j + s * w2:s] += dcols[:, :, :, i, j]
+
+        # conv 1 (pas de gradient vers l'entrée) : chaque position de
+        # sortie renvoie son gradient aux m × m blocs qui la couvrent
+        np.greater(z1, 0, out=on1)
+        dh1 *= on1
+        np.sum(dh1, axis=0, out=g["b1"])
+        c, h, w = self.input_shape
+        s, m = self.strides[0], self._m1
+        hb, wb = h // s, w // s
+        nb = batch_size * hb * wb
+        dZ1 = ws["dZ1"][:nb]
+        dZ1.fill(0)
+        dZ1_view = dZ1.reshape(batch_size, hb, wb, m, m, f1)
+        for di in range(m):
+            for dj in range(m):
+                dZ1_view[:, di:di + h1, dj:dj + w1, di, dj] = dh1_nhwc
+        np.matmul(ws["blocks"][:nb].T, dZ1, out=self._gw1_blocks)
+        np.copyto(self._w1_layout(g["W1"]), self._gw1_blocks.reshape(c, s, s, m, m, f1))
+
+        return g, td
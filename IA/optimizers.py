@@ -0,0 +1,147 @@
+import numpy as np
+
+# ============================================================
+# Optimiseurs à état préalloué
+# ============================================================
+#
+# Les moments sont alloués une fois par paramètre (mêmes clés, shapes et
+# dtype que params) et mis à jour sur place, avec un tampon par
+# paramètre pour les termes intermédiaires : step() n'alloue rien.
+#
+# Le clipping se fait sur la norme globale de tous les gradients
+# (somme des carrés en une passe, un vdot par tenseur), en réduisant
+# grads sur place si elle dépasse max_norm.
+
+
+def global_norm(grads):
+    """Norme L2 de l'ensemble des gradients."""
+    return float(np.sqrt(sum(float(np.vdot(g, g)) for g in grads.values())))
+
+
+def clip_by_global_norm(grads, max_norm):
+    """Réduit grads sur place si leur norme globale dépasse max_norm. Retourne la norme."""
+    norm = global_norm(grads)
+    if norm > max_norm:
+        scale = max_norm / norm
+        for g in grads.values():
+            g *= scale
+    return norm
+
+
+class Optimizer:
+
+    STATE = ()   # noms des dicts de moments (checkpoint)
+
+    def __init__(self, params, lr, max_norm=None):
+        """
+        params   : dict de tableaux, modifiés sur place par step()
+        max_norm : seuil de clipping sur la norme globale (None = aucun)
+        """
+        self.params = params
+        self.lr = lr
+        self.max_norm = max_norm
+        self.t = 0
+        self._tmp = {k: np.empty_like(p) for k, p in params.items()}
+
+    def step(self, grads):
+        """Applique grads (modifiés sur place par le clipping). Retourne la norme globale."""
+        if self.max_norm is not None:
+            norm = clip_by_global_norm(grads, self.max_norm)
+        else:
+            norm = None
+        self.t += 1
+        for key, p in self.params.items():
+            self._update(key, p, grads[key], self._tmp[key])
+        return norm
+
+    def _update(self, key, p, g, tmp):
+        raise NotImplementedError
+
+    def state_dict(self):
+        """(tableaux "m/W1", ..., scalaires) : état complet pour un checkpoint."""
+        arrays = {f"{name}/{k}": v for name in self.STATE for k, v in getattr(self, name).items()}
+        return arrays, {"t": self.t}
+
+    def load_state_dict(self, arrays, scalars):
+        """Recharge (recopie) un état renvoyé par state_dict."""
+        self.t = scalars["t"]
+        for name in self.STATE:
+            for k, v in getattr(self, name).items():
+                np.copyto(v, arrays[f"{name}/{k}"])
+
+
+class SGD(Optimizer):
+
+    def _update(self, key, p, g, tmp):
+        np.multiply(g, self.lr, out=tmp)
+        p -= tmp
+
+
+class RMSProp(Optimizer):
+
+    STATE = ("v",)
+
+    def __init__(self, params, lr=1e-4, rho=0.99, eps=1e-8, max_norm=None):
+        super().__init__(params, lr, max_norm)
+        self.rho = rho
+        self.eps = eps
+        self.v = {k: np.zeros_like(p) for k, p in params.items()}
+
+    def _update(self, key, p, g, tmp):
+        v = self.v[key]
+        # v <- rho v + (1 - rho) g²
+        v *= self.rho
+        np.multiply(g, g, out=tmp)
+        tmp *= 1.0 - self.rho
+        v += tmp
+        # p <- p - lr g / (sqrt(v) + eps)
+        np.sqrt(v, out=tmp)
+        tmp += self.eps
+        np.divide(g, tmp, out=tmp)
+        tmp *= self.lr
+        p -= tmp
+
+
+class Adam(Optimizer):
+
+    STATE = ("m", "v")
+
+    def __init__(self, params, lr=1e-4, beta1=0.9, beta2=0.999, eps=1e-8, max_norm=None):
+        super().__init__(params, lr, max_norm)
+        self.beta1 = beta1
+        self.beta2 = beta2
+        self.eps = eps
+        self.m = {k: np.zeros_like(p) for k, p in params.items()}
+        self.v = {k: np.zeros_like(p) for k, p in params.items()}
+
+    def step(self, grads):
+        # correction de biais regroupée dans le pas (forme de Kingma & Ba, §2)
+        t = self.t + 1
+        self._lr_t = self.lr * float(np.sqrt(1.0 - self.beta2 ** t)) / (1.0 - self.beta1 ** t)
+        return super().step(grads)
+
+    def _update(self, key, p, g, tmp):
+        m, v = self.m[key], self.v[key]
+        # m <- b1 m + (1 - b1) g
+        m *= self.beta1
+        np.multiply(g, 1.0 - self.beta1, out=tmp)
+        m += tmp
+        # v <- b2 v + (1 - b2) g²
+        v *= self.beta2
+        np.multiply(g, g, out=tmp)
+        tmp *= 1.0 - self.beta2
+        v += tmp
+        # p <- p - lr_t m / (sqrt(v) + eps)
+        np.sqrt(v, out=tmp)
+        tmp += self.eps
+        np.divide(m, tmp, out=tmp)
+        tmp *= self._lr_t
+        p -= tmp
+
+
+OPTIMIZERS = {"sgd": SGD, "rmsprop": RMSProp, "adam": Adam}
+
+
+def make_optimizer(name, params, lr, max_norm=None, **kwargs):
+    """Optimiseur par nom : "sgd", "rmsprop" ou "adam"."""
+    return OPTIMIZERS[name](params, lr=lr, max_norm=max_norm, **kwargs)
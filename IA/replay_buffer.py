@@ -0,0 +1,552 @@
+import os
+import json
+from multiprocessing import shared_memory
+import numpy as np
+
+# ============================================================
+# Replay Buffer circulaire, stockage préalloué
+# ============================================================
+#
+# Chaque frame n'est stockée qu'une seule fois (en uint8 par défaut) :
+# un état = stack_size frames consécutives, reconstruit à partir des
+# indices au moment du tirage. state et next_state d'une transition
+# partagent donc stack_size - 1 frames au lieu d'être copiés deux fois.
+#
+# Slot i : frame i + transition (action, reward, done) qui part de
+# l'état se terminant en i et arrive à l'état se terminant en i + 1.
+# Le dernier état d'un épisode a son propre slot (sans transition),
+# l'épisode suivant commence par un slot marqué "first".
+#
+# Avec n_envs environnements écrits à tour de rôle (une frame chacun par
+# pas, toujours dans le même ordre), les frames d'un même environnement
+# sont espacées de n_envs slots : les mêmes règles s'appliquent avec
+# i - n_envs / i + n_envs à la place de i - 1 / i + 1.
+
+
+class ReplayBuffer:
+
+    def __init__(self, capacity, state_shape, stack_size=4,
+                 dtype=np.uint8, scale=1.0, seed=None, n_envs=1):
+        """
+        capacity    : nombre de frames conservées (tous environnements)
+        state_shape : shape d'un état renvoyé par le processor, ex (4, 84, 84)
+                      ou (16, 84, 84) ; la 1re dimension contient stack_size frames
+        dtype       : type de stockage des frames
+        scale       : état = frame stockée / scale (255 pour les niveaux de
+                      gris dans [0, 1], 1 pour des masques 0/1)
+        n_envs      : nombre d'environnements écrivant à tour de rôle
+        """
+        self.capacity = capacity
+        self.n_envs = n_envs
+        self.state_shape = tuple(state_shape)
+        self.stack_size = stack_size
+        self.frame_shape = (self.state_shape[0] // stack_size,) + self.state_shape[1:]
+        self.scale = scale
+        self.rng = np.random.default_rng(seed)
+
+        self.frames = self._allocate("frames", (capacity,) + self.frame_shape, dtype)
+        self.actions = self._allocate("actions", (capacity,), np.int64)
+        self.rewards = self._allocate("rewards", (capacity,), np.float32)
+        self.dones = self._allocate("dones", (capacity,), np.bool_)
+        self.first = self._allocate("first", (capacity,), np.bool_)
+        self.has_next = self._allocate("has_next", (capacity,), np.bool_)
+
+        self.cursor = 0            # prochain slot écrit
+        self.size = 0              # nombre de slots écrits
+        self.num_transitions = 0   # slots avec transition complète
+
+        self._offsets = np.arange(-stack_size + 1, 1) * n_envs
+        self._positions = np.arange(stack_size)
+        self._frame_tmp = np.empty(self.frame_shape, dtype=np.float32)
+
+    def _allocate(self, name, shape, dtype):
+        """Stockage d'un champ (redéfini par les variantes sur disque / partagées)."""
+        return np.zeros(shape, dtype=dtype)
+
+    def __len__(self):
+        return self.num_transitions
+
+    # --------------------------------------------------------
+    # Ecriture
+    # --------------------------------------------------------
+
+    def begin_episode(self, state):
+        """Premier état d'un épisode (retourné par reset_env)."""
+        slot = self._write_frame(state)
+        self.first[slot] = True
+
+    def add(self, action, reward, next_state, done):
+        """Transition depuis le dernier état écrit (par cet environnement) vers next_state."""
+        prev = (self.cursor - self.n_envs) % self.capacity
+        self.actions[prev] = action
+        self.rewards[prev] = reward
+        self.dones[prev] = done
+        self.has_next[prev] = True
+        self.num_transitions += 1
+
+        slot = self._write_frame(next_state)
+        self.first[slot] = False
+
+    def _write_frame(self, state):
+        """Copie la frame la plus récente de state dans le prochain slot."""
+        slot = self.cursor
+        if self.has_next[slot]:
+            self.num_transitions -= 1
+        self.has_next[slot] = False
+
+        frame = np.reshape(state, (self.stack_size,) + self.frame_shape)[-1]
+        if self.scale != 1.0:
+            np.multiply(frame, self.scale, out=self._frame_tmp)
+            frame = np.rint(self._frame_tmp, out=self._frame_tmp)
+        self.frames[slot] = frame
+
+        self.cursor = (slot + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+        return slot
+
+    # --------------------------------------------------------
+    # Tirage
+    # --------------------------------------------------------
+
+    def _read_frames(self, slots):
+        """Frames des slots (tableau d'indices quelconque)."""
+        return self.frames[slots]
+
+    def valid(self, idx):
+        """
+        Slots utilisables : transition complète, et (buffer plein) historique
+        qui ne traverse pas le curseur, c.-à-d. pas de frames déjà écrasées.
+        """
+        ok = self.has_next[idx]
+        if self.size == self.capacity:
+            ok &= (idx - self.cursor) % self.capacity >= (self.stack_size - 1) * self.n_envs
+        return ok
+
+    def sample(self, batch_size, states_out=None, next_states_out=None):
+        """
+        Tirage uniforme (vectorisé) de batch_size transitions.
+
+        Retourne (states, actions, rewards, next_states, dones) comme
+        IA.DQN.sample_batch ; states / next_states sont en float32, aplatis
+        (batch_size, input_dim), écrits dans states_out / next_states_out
+        si fournis.
+        """
+        return self.gather(self.sample_indices(batch_size), states_out, next_states_out)
+
+    def sample_indices(self, batch_size):
+        if self.num_transitions == 0:
+            raise ValueError("replay buffer vide")
+        idx = self.rng.integers(0, self.size, batch_size)
+        bad = ~self.valid(idx)
+        while bad.any():
+            idx[bad] = self.rng.integers(0, self.size, int(bad.sum()))
+            bad = ~self.valid(idx)
+        return idx
+
+    def gather(self, idx, states_out=None, next_states_out=None):
+        batch_size = len(idx)
+        input_dim = int(np.prod(self.state_shape))
+        if states_out is None:
+            states_out = np.empty((batch_size, input_dim), dtype=np.float32)
+        if next_states_out is None:
+            next_states_out = np.empty((batch_size, input_dim), dtype=np.float32)
+
+        # une seule lecture pour les deux états (frames communes comprises)
+        frames = self._read_frames(np.concatenate([self._slots(idx), self._slots(idx + self.n_envs)]))
+        self._copy_states(frames[:batch_size], states_out)
+        self._copy_states(frames[batch_size:], next_states_out)
+
+        actions = self.actions[idx]
+        rewards = self.rewards[idx]
+        dones = self.dones[idx].astype(np.float32)
+        return states_out, actions, rewards, next_states_out, dones
+
+    def _slots(self, last):
+        """
+        Slots des frames des états se terminant aux slots last, (B, S).
+        Avant un début d'épisode, les frames sont remplacées par la première
+        frame de l'épisode (même remplissage que FrameStack après reset).
+        """
+        window = (last[:, None] + self._offsets) % self.capacity     # (B, S)
+        start = np.where(self.first[window], self._positions, 0).max(axis=1)
+        src = np.maximum(self._positions, start[:, None])
+        return np.take_along_axis(window, src, axis=1)
+
+    def _copy_states(self, frames, out):
+        """frames (B, S, ...) stockées -> états float32 aplatis dans out."""
+        dst = out.reshape(frames.shape)
+        np.copyto(dst, frames)
+        if self.scale != 1.0:
+            np.divide(dst, np.float32(self.scale), out=dst)
+
+
+# ============================================================
+# Variante sur disque (np.memmap), persistante
+# ============================================================
+#
+# Mêmes champs, chacun dans un fichier .npy de directory ouvert en
+# memmap : la capacité n'est plus limitée par la RAM, seul le cache de
+# pages du système garde les frames récemment lues. Les compteurs sont
+# écrits dans meta.json par flush() ; en relançant avec le même
+# directory, le buffer reprend là où le dernier flush() l'a laissé.
+
+
+class MemmapReplayBuffer(ReplayBuffer):
+
+    META_FILE = "meta.json"
+
+    def __init__(self, directory, capacity, state_shape, stack_size=4,
+                 dtype=np.uint8, scale=1.0, seed=None, n_envs=1):
+        """
+        directory : dossier des fichiers du buffer (créé si absent). S'il
+                    contient déjà un buffer de mêmes dimensions, il est repris.
+                    Sans meta.json (crash avant le premier flush()), les
+                    fichiers présents sont recréés vides.
+        """
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        meta = self._load_meta()
+        self._reuse_files = meta is not None
+        super().__init__(capacity, state_shape, stack_size, dtype, scale, seed, n_envs)
+
+        if meta is not None:
+            self._resume(meta)
+
+    def _path(self, name):
+        return os.path.join(self.directory, name + ".npy")
+
+    def _allocate(self, name, shape, dtype):
+        path = self._path(name)
+        if self._reuse_files and os.path.exists(path):
+            array = np.lib.format.open_memmap(path, mode="r+")
+            if array.shape != shape or array.dtype != np.dtype(dtype):
+                raise ValueError(
+                    f"{path} : shape {array.shape} / {array.dtype} "
+                    f"au lieu de {shape} / {np.dtype(dtype)}"
+                )
+            return array
+        return np.lib.format.open_memmap(path, mode="w+", dtype=dtype, shape=shape)
+
+    def _load_meta(self):
+        path = os.path.join(self.directory, self.META_FILE)
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return json.load(f)
+
+    def _resume(self, meta):
+        if (meta["capacity"] != self.capacity
+                or tuple(meta["state_shape"]) != self.state_shape
+                or meta["stack_size"] != self.stack_size
+                or meta.get("n_envs", 1) != self.n_envs):
+            raise ValueError(f"{self.directory} : buffer de dimensions différentes")
+        self.cursor = meta["cursor"]
+        self.size = meta["size"]
+
+        # Les slots écrits après le dernier flush() sont abandonnés :
+        # les épisodes en cours sont coupés au dernier slot sauvegardé, et
+        # les slots jamais comptés ne sont plus considérés comme remplis.
+        for k in range(1, self.n_envs + 1):
+            self.has_next[(self.cursor - k) % self.capacity] = False
+        if self.size < self.capacity:
+            self.has_next[self.size:] = False
+        self.num_transitions = int(np.count_nonzero(self.has_next))
+
+    def flush(self):
+        """Ecrit les données sur disque puis les compteurs (meta.json)."""
+        for name in ("frames", "actions", "rewards", "dones", "first", "has_next"):
+            getattr(self, name).flush()
+        meta = {
+            "capacity": self.capacity,
+            "state_shape": list(self.state_shape),
+            "stack_size": self.stack_size,
+            "n_envs": self.n_envs,
+            "cursor": self.cursor,
+            "size": self.size,
+            "num_transitions": self.num_transitions,
+        }
+        # écriture atomique : un crash pendant flush laisse l'ancien meta.json
+        path = os.path.join(self.directory, self.META_FILE)
+        with open(path + ".tmp", "w") as f:
+            json.dump(meta, f)
+        os.replace(path + ".tmp", path)
+
+    def _read_frames(self, slots):
+        """
+        Lecture groupée : chaque frame n'est lue qu'une fois (state et
+        next_state partagent stack_size - 1 frames) et les slots sont lus
+        par indices croissants, ce qui parcourt le fichier dans l'ordre.
+        """
+        unique, inverse = np.unique(slots, return_inverse=True)
+        return self.frames[unique][inverse.reshape(slots.shape)]
+
+
+# ============================================================
+# Replay priorisé (sum-tree)
+# ============================================================
+#
+# Chaque slot a une priorité p_i = (|TD| + eps)^alpha ; une transition
+# est tirée avec la probabilité p_i / somme(p). Les sommes partielles
+# sont rangées dans un arbre binaire complet stocké dans un tableau :
+# feuilles en [n, 2n), noeud k = somme de 2k et 2k + 1, racine en 1.
+
+
+class SumTree:
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.n = 1 << max(capacity - 1, 1).bit_length()   # puissance de 2 >= capacity
+        self.depth = self.n.bit_length() - 1
+        self.tree = np.zeros(2 * self.n, dtype=np.float64)
+
+    def total(self):
+        return self.tree[1]
+
+    def get(self, idx):
+        return self.tree[self.n + idx]
+
+    def set(self, idx, value):
+        """Met à jour une feuille, O(log N)."""
+        k = self.n + idx
+        self.tree[k] = value
+        k //= 2
+        while k >= 1:
+            self.tree[k] = self.tree[2 * k] + self.tree[2 * k + 1]
+            k //= 2
+
+    def update(self, idx, values):
+        """Met à jour un lot de feuilles (indices répétés : dernière valeur)."""
+        k = self.n + np.asarray(idx)
+        self.tree[k] = values
+        for _ in range(self.depth):
+            k = np.unique(k // 2)
+            self.tree[k] = self.tree[2 * k] + self.tree[2 * k + 1]
+
+    def find(self, values):
+        """
+        Feuilles dont l'intervalle de somme cumulée contient values
+        (vectorisé, une étape numpy par niveau).
+        """
+        values = np.array(values, dtype=np.float64)
+        k = np.ones(len(values), dtype=np.int64)
+        for _ in range(self.depth):
+            left = self.tree[2 * k]
+            right = values >= left
+            values -= left * right
+            k = 2 * k + right
+        return k - self.n
+
+
+class PrioritizedReplayBuffer(ReplayBuffer):
+
+    def __init__(self, capacity, state_shape, stack_size=4, dtype=np.uint8,
+                 scale=1.0, seed=None, n_envs=1, alpha=0.6, beta=0.4, eps=1e-6):
+        """
+        alpha : 0 -> tirage uniforme, 1 -> proportionnel à |TD|
+        beta  : correction des poids d'importance (à faire tendre vers 1)
+        eps   : priorité minimale d'une transition
+        """
+        super().__init__(capacity, state_shape, stack_size, dtype, scale, seed, n_envs)
+        self.priorities = SumTree(capacity)
+        self.alpha = alpha
+        self.beta = beta
+        self.eps = eps
+        self.max_priority = 1.0
+
+    def add(self, action, reward, next_state, done):
+        prev = (self.cursor - self.n_envs) % self.capacity
+        super().add(action, reward, next_state, done)
+        # nouvelle transition : priorité maximale, pour être vue au moins une fois
+        self.priorities.set(prev, self.max_priority)
+
+    def _write_frame(self, state):
+        slot = super()._write_frame(state)
+        # Slot sans transition, et (buffer plein) slots dont l'historique
+        # traverse désormais le curseur : probabilité nulle
+        self.priorities.set(slot, 0.0)
+        if self.size == self.capacity:
+            for k in range((self.stack_size - 1) * self.n_envs):
+                zone = (self.cursor + k) % self.capacity
+                if self.priorities.get(zone) != 0.0:
+                    self.priorities.set(zone, 0.0)
+        return slot
+
+    def sample(self, batch_size, states_out=None, next_states_out=None, beta=None):
+        """
+        Tirage stratifié : [0, somme(p)) est découpé en batch_size
+        segments égaux, une transition tirée dans chacun.
+
+        Retourne (states, actions, rewards, next_states, dones, weights, idx) :
+        weights = poids d'importance (N·P(i))^-beta normalisés par leur
+        maximum dans le batch, idx à passer à update_priorities.
+        """
+        idx = self.sample_indices(batch_size)
+        batch = self.gather(idx, states_out, next_states_out)
+
+        beta = self.beta if beta is None else beta
+        probs = self.priorities.get(idx) / self.priorities.total()
+        weights = (self.num_transitions * probs) ** -beta
+        weights = (weights / weights.max()).astype(np.float32)
+        return batch + (weights, idx)
+
+    def sample_indices(self, batch_size):
+        if self.num_transitions == 0:
+            raise ValueError("replay buffer vide")
+        segment = self.priorities.total() / batch_size
+        values = (np.arange(batch_size) + self.rng.random(batch_size)) * segment
+        idx = self.priorities.find(values)
+        # arrondis en limite de segment : on retire dans le même segment
+        bad = ~self.valid(idx) | (self.priorities.get(idx) == 0.0)
+        while bad.any():
+            values[bad] = (np.flatnonzero(bad) + self.rng.random(int(bad.sum()))) * segment
+            idx[bad] = self.priorities.find(values[bad])
+            bad = ~self.valid(idx) | (self.priorities.get(idx) == 0.0)
+        return idx
+
+    def update_priorities(self, idx, td_errors):
+        """Nouvelles priorités à partir des erreurs TD (diff de backward)."""
+        priorities = (np.abs(td_errors) + self.eps) ** self.alpha
+        # un slot réécrit depuis le tirage ne doit pas retrouver de priorité
+        self.priorities.update(idx, np.where(self.valid(idx), priorities, 0.0))
+        self.max_priority = max(self.max_priority, float(priorities.max()))
+
+
+# ============================================================
+# Variante en mémoire partagée (acteurs / learner multiprocessus)
+# ============================================================
+#
+# Champs et compteurs (cursor, size, num_transitions) dans des blocs
+# multiprocessing.shared_memory : un processus acteur écrit, le learner
+# lit le même buffer sans copie. Un seul écrivain par buffer ; chaque
+# acteur a le sien (ShardedReplay les regroupe pour le tirage).
+#
+# L'acteur écrit les données avant d'avancer les compteurs, et les slots
+# proches du curseur (plus une marge) sont exclus par valid() : le
+# learner peut lire pendant les écritures sans verrou.
+#
+# Les acteurs doivent être lancés par multiprocessing depuis le créateur :
+# ils partagent alors son resource_tracker, et seul le créateur unlink.
+
+
+class SharedReplayBuffer(ReplayBuffer):
+
+    SAFETY_MARGIN = 64   # slots
+
+    def __init__(self, name, capacity, state_shape, stack_size=4, dtype=np.uint8,
+                 scale=1.0, seed=None, n_envs=1, create=True):
+        """
+        name   : préfixe des blocs de mémoire partagée
+        create : True -> crée les blocs (processus propriétaire, qui
+                 appellera unlink) ; False -> s'attache à des blocs existants
+        """
+        if capacity <= 2 * ((stack_size - 1) * n_envs + self.SAFETY_MARGIN):
+            raise ValueError(f"capacité trop petite pour la marge de lecture ({capacity})")
+        self.name = name
+        self.create = create
+        self._shm = []
+        self._counters = self._allocate("counters", (3,), np.int64)
+        counters = self._counters.copy()
+        super().__init__(capacity, state_shape, stack_size, dtype, scale, seed, n_envs)
+        if not create:
+            self._counters[:] = counters    # __init__ a remis les compteurs à 0
+        self._spec = dict(name=name, capacity=capacity, state_shape=self.state_shape,
+                          stack_size=stack_size, dtype=np.dtype(dtype).str,
+                          scale=scale, n_envs=n_envs)
+
+    def spec(self):
+        """Arguments (picklables) pour s'attacher au buffer depuis un autre processus."""
+        return dict(self._spec)
+
+    @classmethod
+    def attach(cls, spec, seed=None):
+        return cls(seed=seed, create=False, **spec)
+
+    def _allocate(self, name, shape, dtype):
+        size = max(int(np.prod(shape)) * np.dtype(dtype).itemsize, 1)
+        shm = shared_memory.SharedMemory(f"{self.name}_{name}", create=self.create, size=size)
+        self._shm.append(shm)
+        array = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+        if self.create:
+            array.fill(0)
+        return array
+
+    def add(self, action, reward, next_state, done):
+        # même écriture que ReplayBuffer.add, mais la transition n'est
+        # publiée (has_next, compteur) qu'une fois sa frame suivante écrite
+        prev = (self.cursor - self.n_envs) % self.capacity
+        self.actions[prev] = action
+        self.rewards[prev] = reward
+        self.dones[prev] = done
+
+        slot = self._write_frame(next_state)
+        self.first[slot] = False
+
+        self.has_next[prev] = True
+        self.num_transitions += 1
+
+    def valid(self, idx):
+        # marge supplémentaire devant le curseur : un slot tiré ne doit pas
+        # être réécrit par l'acteur pendant que le learner le lit
+        ok = super().valid(idx)
+        if self.size == self.capacity:
+            ok &= (idx - self.cursor) % self.capacity >= \
+                (self.stack_size - 1) * self.n_envs + self.SAFETY_MARGIN
+        return ok
+
+    cursor = property(lambda self: int(self._counters[0]),
+                      lambda self, value: self._counters.__setitem__(0, value))
+    size = property(lambda self: int(self._counters[1]),
+                    lambda self, value: self._counters.__setitem__(1, value))
+    num_transitions = property(lambda self: int(self._counters[2]),
+                               lambda self, value: self._counters.__setitem__(2, value))
+
+    def close(self):
+        """Détache ce processus des blocs (unlink en plus pour le créateur)."""
+        for name in ("frames", "actions", "rewards", "dones", "first", "has_next", "_counters"):
+            setattr(self, name, None)
+        for shm in self._shm:
+            shm.close()
+            if self.create:
+                shm.unlink()
+        self._shm = []
+
+
+class ShardedReplay:
+    """
+    Tirage uniforme sur plusieurs buffers (un par acteur) : nombre de
+    transitions par buffer tiré proportionnellement à leur taille, puis
+    tirage uniforme dans chacun, écrit directement dans les lignes
+    correspondantes des buffers de sortie.
+    """
+
+    def __init__(self, shards, seed=None):
+        self.shards = shards
+        self.rng = np.random.default_rng(seed)
+
+    def __len__(self):
+        return sum(len(shard) for shard in self.shards)
+
+    def sample(self, batch_size, states_out=None, next_states_out=None):
+        sizes = np.array([len(shard) for shard in self.shards], dtype=np.float64)
+        if sizes.sum() == 0:
+            raise ValueError("replay buffer vide")
+        counts = self.rng.multinomial(batch_size, sizes / sizes.sum())
+
+        input_dim = int(np.prod(self.shards[0].state_shape))
+        if states_out is None:
+            states_out = np.empty((batch_size, input_dim), dtype=np.float32)
+        if next_states_out is None:
+            next_states_out = np.empty((batch_size, input_dim), dtype=np.float32)
+        actions = np.empty(batch_size, dtype=np.int64)
+        rewards = np.empty(batch_size, dtype=np.float32)
+        dones = np.empty(batch_size, dtype=np.float32)
+
+        start = 0
+        for shard, count in zip(self.shards, counts):
+            if count == 0:
+                continue
+            rows = slice(start, start + count)
+            _, actions[rows], rewards[rows], _, dones[rows] = shard.gather(
+                shard.sample_indices(count), states_out[rows], next_states_out[rows])
+            start += count
+        return states_out, actions, rewards, next_states_out, dones
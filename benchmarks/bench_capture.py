@@ -0,0 +1,82 @@
+# benchmarks/bench_capture.py
+"""
+Latence et allocations par frame de la capture d'écran (FrameProcessor v1).
+
+Lancement (depuis la racine du repo) :
+    python -m benchmarks.bench_capture [nb_frames]
+
+Compare l'ancien chemin (array3d + transpose + cvtColor + resize) à
+FrameProcessor.grab, qui lit l'écran en place et écrit dans des buffers
+préalloués. Les allocations sont mesurées avec tracemalloc (NumPy y
+déclare ses buffers de données).
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import cv2
+import numpy as np
+import pygame
+
+from config import WIDTH, HEIGHT
+from game.engine import GameEngine
+from game.renderer import render
+from capture.screen_capture import FrameProcessor
+
+
+def legacy_grab(screen, target_size=(84, 84)):
+    frame = pygame.surfarray.array3d(screen)
+    frame = np.transpose(frame, (1, 0, 2))[:, :, ::-1]
+    gray = cv2.cvtColor(frame, cv2.COLOR_RGB2GRAY)
+    gray = cv2.resize(gray, target_size, interpolation=cv2.INTER_AREA)
+    return gray.astype(np.float32) / 255.0
+
+
+def make_screens(n):
+    """Quelques frames de jeu différentes, rendues une fois."""
+    pygame.init()
+    engine = GameEngine()
+    screens = []
+    for t in range(n * 10):
+        engine.update(t % 45 == 0, WIDTH)
+        if t % 10 == 0:
+            screen = pygame.Surface((WIDTH, HEIGHT))
+            render(screen, engine)
+            screens.append(screen)
+    return screens
+
+
+def measure(fn, screens, n_frames):
+    fn(screens[0])  # préchauffage (buffers, caches)
+    start = time.perf_counter()
+    for i in range(n_frames):
+        fn(screens[i % len(screens)])
+    latency = (time.perf_counter() - start) / n_frames
+
+    tracemalloc.start()
+    peak = 0
+    for i in range(50):
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        fn(screens[i % len(screens)])
+        peak = max(peak, tracemalloc.get_traced_memory()[1] - base)
+    tracemalloc.stop()
+    return latency, peak
+
+
+if __name__ == "__main__":
+    n_frames = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    screens = make_screens(20)
+    processor = FrameProcessor()
+
+    for screen in screens:
+        assert np.array_equal(legacy_grab(screen), processor.grab(screen))
+
+    for name, fn in (("array3d + cvtColor", legacy_grab),
+                     ("grab (vue en place)", processor.grab),
+                     ("process (grab + pile)", processor.process)):
+        latency, peak = measure(fn, screens, n_frames)
+        print(f"{name:22s} : {latency * 1e3:7.3f} ms/frame | pic alloué {peak / 1024:9.1f} Kio/frame")
@@ -0,0 +1,65 @@
+# benchmarks/bench_checkpoint.py
+"""
+Sauvegarde / chargement des paramètres du DQN dense : np.save d'un dict
+(pickle) contre le format de IA/checkpoint.py (chargement par mmap),
+et temps bloquant pour la boucle d'entraînement avec CheckpointWriter
+(copie des tableaux seulement) contre une écriture synchrone de l'état
+complet (réseau, cible, moments d'Adam).
+
+Lancement (depuis la racine du repo) :
+    python -m benchmarks.bench_checkpoint [dossier]
+"""
+import os
+import sys
+import time
+import tempfile
+
+import numpy as np
+
+from IA.DQN import QNetwork
+from IA.optimizers import Adam
+from IA.checkpoint import save_checkpoint, load_params, CheckpointWriter, prefixed
+
+
+def timed(fn, n=5):
+    start = time.perf_counter()
+    for _ in range(n):
+        result = fn()
+    return (time.perf_counter() - start) / n, result
+
+
+if __name__ == "__main__":
+    directory = sys.argv[1] if len(sys.argv) > 1 else tempfile.mkdtemp()
+    net = QNetwork(4 * 84 * 84, 128, 64, 2)
+    target = net.clone()
+    opt = Adam(net.params, 1e-4)
+    opt_arrays, _ = opt.state_dict()
+    state = {**prefixed("params", net.params), **prefixed("target", target.params),
+             **prefixed("opt", opt_arrays)}
+
+    npy = os.path.join(directory, "params.npy")
+    ckpt = os.path.join(directory, "params.ckpt")
+    t_npy_save, _ = timed(lambda: np.save(npy, net.params, allow_pickle=True))
+    t_ckpt_save, _ = timed(lambda: save_checkpoint(ckpt, prefixed("params", net.params)))
+    t_npy_load, _ = timed(lambda: np.load(npy, allow_pickle=True).item())
+    t_ckpt_load, params = timed(lambda: load_params(ckpt))
+    assert all(np.array_equal(params[k], net.params[k]) for k in net.params)
+
+    full = os.path.join(directory, "state.ckpt")
+    t_sync, _ = timed(lambda: save_checkpoint(full, state))
+    writer = CheckpointWriter(full)
+    blocking = []
+    for _ in range(5):
+        writer.wait()      # hors mesure : on ne compte que submit
+        start = time.perf_counter()
+        writer.submit(state)
+        blocking.append(time.perf_counter() - start)
+    writer.close()
+
+    print(f"paramètres, np.save (pickle)   : {t_npy_save * 1e3:8.2f} ms")
+    print(f"paramètres, save_checkpoint    : {t_ckpt_save * 1e3:8.2f} ms")
+    print(f"paramètres, np.load (pickle)   : {t_npy_load * 1e3:8.2f} ms")
+    print(f"paramètres, load_params (mmap) : {t_ckpt_load * 1e3:8.2f} ms")
+    print(f"état complet ({os.path.getsize(full) / 1e6:.1f} Mo)")
+    print(f"  écriture synchrone           : {t_sync * 1e3:8.2f} ms")
+    print(f"  CheckpointWriter.submit      : {np.mean(blocking) * 1e3:8.2f} ms bloquants")
@@ -0,0 +1,53 @@
+# benchmarks/bench_conv.py
+"""
+Compare le Q-network dense (QNetwork, entrée aplatie 28224) et le
+Q-network convolutif (ConvQNetwork, im2col) : nombre de paramètres,
+latence d'un forward pour agir (batch 1) et pas d'apprentissage
+(train_step fusionné) par seconde.
+
+Lancement (depuis la racine du repo) :
+    python -m benchmarks.bench_conv [nb_pas] [batch_size]
+"""
+import sys
+import time
+
+import numpy as np
+
+from IA.DQN import QNetwork
+from IA.conv_dqn import ConvQNetwork
+
+STATE_SHAPE = (4, 84, 84)
+
+
+def make_batch(net, batch_size, rng):
+    states, next_states = net.batch_buffers(batch_size)
+    states[:] = rng.random(states.shape, dtype=np.float32)
+    next_states[:] = rng.random(next_states.shape, dtype=np.float32)
+    actions = rng.integers(0, 2, batch_size)
+    rewards = np.ones(batch_size, dtype=np.float32)
+    dones = (rng.random(batch_size) < 0.05).astype(np.float32)
+    return states, actions, rewards, next_states, dones
+
+
+def rate(fn, n):
+    fn()
+    start = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return n / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    batch_size = int(sys.argv[2]) if len(sys.argv) > 2 else 32
+    rng = np.random.default_rng(0)
+
+    for name, net in (("dense", QNetwork(int(np.prod(STATE_SHAPE)))),
+                      ("conv ", ConvQNetwork(STATE_SHAPE, seed=0))):
+        batch = make_batch(net, batch_size, rng)
+        x = batch[0][0]
+        n_params = sum(p.size for p in net.params.values())
+        act = rate(lambda: net.forward(x), 10 * n)
+        train = rate(lambda: net.train_step(batch, 0.99, 1e-3), n)
+        print(f"{name} : {n_params / 1e6:5.2f} M paramètres | "
+              f"forward (1 état) {1e3 / act:6.3f} ms | train_step {train:7.1f} pas/s")
@@ -0,0 +1,96 @@
+# benchmarks/bench_dqn.py
+"""
+Compare un pas d'apprentissage DQN (cibles + forward + backward + mise à
+jour) : fonctions d'origine de IA/DQN.py (paramètres float64) contre
+QNetwork (float32, buffers préalloués), en quatre appels ou fusionné
+(QNetwork.train_step : un seul forward sur states + next_states), avec
+descente simple ou Adam (IA/optimizers.py).
+
+Lancement (depuis la racine du repo) :
+    python -m benchmarks.bench_dqn [nb_pas] [batch_size]
+"""
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from IA.DQN import (
+    init_network, forward, compute_targets, backward, update_params, QNetwork
+)
+from IA.optimizers import Adam
+
+INPUT_DIM = 4 * 84 * 84
+
+
+def make_batch(batch_size, rng):
+    states = rng.random((batch_size, INPUT_DIM), dtype=np.float32)
+    next_states = rng.random((batch_size, INPUT_DIM), dtype=np.float32)
+    actions = rng.integers(0, 2, batch_size)
+    rewards = np.ones(batch_size, dtype=np.float32)
+    dones = (rng.random(batch_size) < 0.05).astype(np.float32)
+    return states, actions, rewards, next_states, dones
+
+
+def step_functions(params, batch, lr=1e-3, gamma=0.99):
+    states, actions, rewards, next_states, dones = batch
+    targets = compute_targets(params, rewards, next_states, dones, gamma)
+    _, cache = forward(params, states)
+    grads = backward(params, cache, actions, targets)
+    update_params(params, grads, lr)
+
+
+def step_network(net, batch, lr=1e-3, gamma=0.99):
+    states, actions, rewards, next_states, dones = batch
+    targets = net.compute_targets(rewards, next_states, dones, gamma)
+    net.forward(states)
+    net.backward(actions, targets)
+    net.update(lr)
+
+
+def step_fused(net, batch, lr=1e-3, gamma=0.99, optimizer=None):
+    net.train_step(batch, gamma, lr, optimizer=optimizer)
+
+
+def measure(step, n):
+    step()  # buffers créés au premier appel
+    tracemalloc.start()
+    step()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    start = time.perf_counter()
+    for _ in range(n):
+        step()
+    return n / (time.perf_counter() - start), peak
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    batch_size = int(sys.argv[2]) if len(sys.argv) > 2 else 32
+
+    np.random.seed(0)
+    params = init_network(INPUT_DIM, 128, 64, 2)
+    net = QNetwork.from_params(params)
+    fused = QNetwork.from_params(params)
+    batch = make_batch(batch_size, np.random.default_rng(0))
+    # batch échantillonné directement dans les buffers de train_step
+    fused_states, fused_next = fused.batch_buffers(batch_size)
+    np.copyto(fused_states, batch[0])
+    np.copyto(fused_next, batch[3])
+    fused_batch = (fused_states,) + batch[1:3] + (fused_next,) + batch[4:]
+
+    # Sanity check : mêmes Q (à la précision float32 près)
+    q_ref, _ = forward(params, batch[0])
+    assert np.allclose(net.forward(batch[0]), q_ref, rtol=1e-4, atol=1e-4)
+
+    sps_f, peak_f = measure(lambda: step_functions(params, batch), n)
+    sps_n, peak_n = measure(lambda: step_network(net, batch), n)
+    sps_t, peak_t = measure(lambda: step_fused(fused, fused_batch), n)
+    adam = Adam(fused.params, lr=1e-4, max_norm=1.0)
+    sps_a, peak_a = measure(lambda: step_fused(fused, fused_batch, optimizer=adam), n)
+
+    print(f"fonctions (float64) : {sps_f:8.1f} pas/s, pic d'allocation {peak_f / 2**20:8.2f} Mo")
+    print(f"QNetwork (float32)  : {sps_n:8.1f} pas/s, pic d'allocation {peak_n / 2**20:8.2f} Mo")
+    print(f"train_step fusionné : {sps_t:8.1f} pas/s, pic d'allocation {peak_t / 2**20:8.2f} Mo")
+    print(f"train_step + Adam   : {sps_a:8.1f} pas/s, pic d'allocation {peak_a / 2**20:8.2f} Mo")
+    print(f"gain                : {sps_n / sps_f:8.1f}x / {sps_t / sps_f:8.1f}x")
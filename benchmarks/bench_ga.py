@@ -0,0 +1,54 @@
+# benchmarks/bench_ga.py
+"""
+Temps d'évaluation d'une génération de l'algorithme génétique
+(train_ga.evaluate) : toute la population en un BatchGameEngine, avec
+ou sans pool de processus, contre une partie à la fois.
+
+Lancement (depuis la racine du repo) :
+    python -m benchmarks.bench_ga [population] [workers]
+"""
+import os
+import sys
+import time
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from train_ga import KEYS, evaluate, random_population, _slices
+
+
+def one_by_one(population, n):
+    """Fitness des n premiers individus, chacun joué seul."""
+    return np.concatenate([evaluate({key: population[key][i:i + 1] for key in KEYS})
+                           for i in range(n)])
+
+
+if __name__ == "__main__":
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count()
+    population = random_population(size, rng=np.random.default_rng(0))
+
+    start = time.perf_counter()
+    fitness = evaluate(population)
+    t_batch = time.perf_counter() - start
+
+    # Sanity check : chaque partie du batch est indépendante des autres
+    n_single = min(size, 50)
+    start = time.perf_counter()
+    single = one_by_one(population, n_single)
+    t_single = (time.perf_counter() - start) * size / n_single
+    assert np.array_equal(single, fitness[:n_single])
+
+    with ProcessPoolExecutor(workers, mp_context=mp.get_context("spawn")) as pool:
+        chunks = [{key: population[key][s] for key in KEYS} for s in _slices(size, workers)]
+        list(pool.map(evaluate, chunks))          # démarrage des processus
+        start = time.perf_counter()
+        pooled = np.concatenate(list(pool.map(evaluate, chunks)))
+        t_pool = time.perf_counter() - start
+    assert np.array_equal(pooled, fitness)
+
+    print(f"{size} parties, {os.cpu_count()} coeur(s)")
+    print(f"une par une (estimé)   : {t_single:8.2f} s")
+    print(f"BatchGameEngine        : {t_batch:8.2f} s")
+    print(f"pool ({workers} processus)     : {t_pool:8.2f} s")
@@ -0,0 +1,51 @@
+# benchmarks/bench_headless.py
+"""
+Mesure le nombre de pas moteur par seconde selon le mode d'environnement.
+
+Lancement (depuis la racine du repo) :
+    python -m benchmarks.bench_headless [nb_pas]
+
+Modes comparés :
+- fenetre_60fps : comportement historique (clock.tick(FPS) + rendu + capture)
+- headless      : pas de limite de FPS, rendu hors écran + capture
+- semantique    : pas de limite de FPS, masques rasterisés sans rendu
+- features      : pas de limite de FPS, vecteur lu dans le moteur sans rendu
+- sans_pixels   : pas de limite de FPS, ni rendu ni capture
+"""
+import os
+import sys
+import time
+import random
+
+# Pas d'écran sur les machines d'entraînement : même le mode "fenêtré"
+# tourne avec le driver dummy, seule la limite de FPS est conservée.
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+from train import make_env, reset_env, step_env
+
+
+def run(mode, n_steps):
+    headless = mode != "fenetre_60fps"
+    observation = {"semantique": "semantic", "features": "features", "sans_pixels": None}.get(mode, "gray")
+    screen, clock, engine, processor = make_env(headless=headless, observation=observation)
+    rng = random.Random(0)
+
+    reset_env(screen, engine, processor, clock)
+    start = time.perf_counter()
+    for _ in range(n_steps):
+        action = 1 if rng.random() < 0.05 else 0
+        _, _, done = step_env(screen, engine, processor, clock, action)
+        if done:
+            reset_env(screen, engine, processor, clock)
+    elapsed = time.perf_counter() - start
+    return n_steps / elapsed
+
+
+if __name__ == "__main__":
+    n_steps = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    for mode, steps in (("fenetre_60fps", min(n_steps, 120)),
+                        ("headless", n_steps),
+                        ("semantique", n_steps),
+                        ("features", n_steps * 10),
+                        ("sans_pixels", n_steps * 10)):
+        print(f"{mode:14s} : {run(mode, steps):10.1f} pas/s")
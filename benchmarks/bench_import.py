@@ -0,0 +1,74 @@
+# benchmarks/bench_import.py
+"""
+Temps d'import des modules (python -X importtime, un processus neuf par
+module) et garde-fou contre les imports lourds : les chemins physique /
+NumPy ne doivent charger ni pygame, ni cv2, ni matplotlib (processus
+workers : ni SDL, ni centaines de ms au démarrage).
+
+Lancement (depuis la racine du repo) :
+    python -m benchmarks.bench_import
+
+Code de sortie 1 si un module charge un paquet interdit.
+"""
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY = {"pygame", "cv2", "matplotlib"}
+
+# module -> paquets qu'il ne doit pas importer
+MODULES = {
+    "config": HEAVY,
+    "game.level": HEAVY,
+    "game.batch_engine": HEAVY,
+    "capture.frame_stack": HEAVY,
+    "capture.semantic_rasterizer": HEAVY,
+    "capture.feature_observer": HEAVY,
+    "IA.DQN": HEAVY,
+    "IA.conv_dqn": HEAVY,
+    "IA.optimizers": HEAVY,
+    "IA.replay_buffer": HEAVY,
+    "IA.agent_qlearning": HEAVY,
+    "train_ga": HEAVY,
+    "train_parallel": HEAVY,
+    # moteur scalaire (pygame.Rect) et boucle DQN : pygame seulement
+    "game.engine": {"cv2", "matplotlib"},
+    "train": {"cv2", "matplotlib"},
+}
+
+
+def import_profile(module):
+    """(temps cumulé en ms, paquets de premier niveau importés) pour module."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True,
+        env=dict(os.environ, PYGAME_HIDE_SUPPORT_PROMPT="1"),
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} a échoué :\n{result.stderr}")
+    total, packages = 0, set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        name = name.strip()
+        packages.add(name.split(".")[0])
+        if name == module:
+            total = int(cumulative) / 1000
+    return total, packages
+
+
+if __name__ == "__main__":
+    failed = []
+    for module, forbidden in MODULES.items():
+        total, packages = import_profile(module)
+        heavy = sorted(packages & forbidden)
+        status = "OK" if not heavy else "importe " + ", ".join(heavy)
+        print(f"{module:30s} : {total:8.1f} ms  {status}")
+        if heavy:
+            failed.append(module)
+    if failed:
+        print(f"Imports lourds dans : {', '.join(failed)}")
+        sys.exit(1)
@@ -0,0 +1,49 @@
+# benchmarks/bench_qlearning.py
+"""
+Coût d'une mise à jour Q-learning tabulaire : QLearningAgent (dict,
+une transition à la fois) contre ArrayQLearningAgent.learn_batch (table
+dense, états discrétisés, transitions par tableaux).
+
+Lancement (depuis la racine du repo) :
+    python -m benchmarks.bench_qlearning [nb_transitions]
+"""
+import sys
+import time
+
+import numpy as np
+
+from IA.agent_qlearning import QLearningAgent, ArrayQLearningAgent, StateDiscretizer
+
+ACTIONS = ["rien", "sauter"]
+BATCH = 4096
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    rng = np.random.default_rng(0)
+    discretizer = StateDiscretizer.uniform([0.0] * 4, [1.0] * 4, 10)
+    states = rng.random((n + 1, 4))
+    actions = rng.integers(0, len(ACTIONS), n)
+    rewards = rng.standard_normal(n)
+
+    # dict : états arrondis comme _state_to_key, sur une partie des transitions
+    n_dict = min(n, 50_000)
+    keys = [tuple(np.round(s, 3).tolist()) for s in states[:n_dict + 1]]
+    labels = [ACTIONS[a] for a in actions[:n_dict]]
+    agent = QLearningAgent(ACTIONS)
+    start = time.perf_counter()
+    for i in range(n_dict):
+        agent.learn(keys[i], labels[i], rewards[i], keys[i + 1])
+    t_dict = (time.perf_counter() - start) / n_dict
+
+    agent = ArrayQLearningAgent(ACTIONS, discretizer)
+    start = time.perf_counter()
+    for i in range(0, n, BATCH):
+        j = min(i + BATCH, n)
+        agent.learn_batch(states[i:j], actions[i:j], rewards[i:j], states[i + 1:j + 1])
+    t_array = (time.perf_counter() - start) / n
+
+    print(f"dict, par transition      : {t_dict * 1e6:8.3f} µs")
+    print(f"tableau, learn_batch      : {t_array * 1e6:8.3f} µs")
+    print(f"gain                      : {t_dict / t_array:8.1f}x "
+          f"({n} transitions en {t_array * n:.2f} s)")
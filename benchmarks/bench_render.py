@@ -0,0 +1,70 @@
+# benchmarks/bench_render.py
+"""
+Coût d'une frame de rendu : render() (écran entier redessiné, textes
+rendus à chaque frame, display.flip) contre Renderer.draw (fond en
+cache, textes et glyphes du score en cache, rects modifiés seulement
+pour display.update).
+
+Lancement (depuis la racine du repo) :
+    python -m benchmarks.bench_render [nb_frames]
+"""
+import os
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import numpy as np
+import pygame
+
+from config import WIDTH, HEIGHT
+from game.engine import GameEngine
+from game.renderer import render, Renderer
+
+
+def play(n_frames):
+    """États successifs d'une partie (recommencée à la mort)."""
+    engine = GameEngine()
+    rng = np.random.default_rng(0)
+    for _ in range(n_frames):
+        engine.update(rng.random() < 0.05, WIDTH)
+        yield engine
+        if engine.is_done():
+            engine.reset()
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    reference = pygame.Surface((WIDTH, HEIGHT))
+
+    # Sanity check : mêmes pixels que render à chaque frame, hors ligne
+    # du score (chiffres composés de glyphes, cf. Renderer)
+    renderer = Renderer(screen)
+    score_line = (slice(0, WIDTH // 4), slice(0, 30))
+    for engine in play(300):
+        render(reference, engine)
+        renderer.draw(engine)
+        expected, actual = (pygame.surfarray.array2d(s) for s in (reference, screen))
+        expected[score_line] = actual[score_line] = 0
+        assert np.array_equal(expected, actual)
+
+    start = time.perf_counter()
+    for engine in play(n):
+        render(screen, engine)
+        pygame.display.flip()
+    t_full = (time.perf_counter() - start) / n
+
+    renderer = Renderer(screen)
+    area = 0
+    start = time.perf_counter()
+    for engine in play(n):
+        dirty = renderer.draw(engine)
+        pygame.display.update(dirty)
+        area += sum(r.w * r.h for r in dirty)
+    t_dirty = (time.perf_counter() - start) / n
+
+    print(f"render + flip             : {t_full * 1e6:8.1f} µs/frame")
+    print(f"Renderer + update(dirty)  : {t_dirty * 1e6:8.1f} µs/frame "
+          f"({area / n / (WIDTH * HEIGHT):.1%} de l'écran)")
@@ -0,0 +1,66 @@
+# benchmarks/bench_replay.py
+"""
+Compare le tirage de batchs : replay en mémoire (ReplayBuffer) contre
+replay sur disque (MemmapReplayBuffer), avec des frames aléatoires de la
+taille de l'observation en niveaux de gris.
+
+Lancement (depuis la racine du repo) :
+    python -m benchmarks.bench_replay [capacité] [dossier]
+"""
+import shutil
+import sys
+import tempfile
+import timeit
+
+import numpy as np
+
+from IA.replay_buffer import ReplayBuffer, MemmapReplayBuffer
+
+STATE_SHAPE = (4, 84, 84)
+EPISODE_LEN = 500
+
+
+def fill(buffer, n, rng):
+    state = np.zeros(STATE_SHAPE, dtype=np.float32)
+    for t in range(n):
+        state[-1] = rng.integers(0, 256, STATE_SHAPE[1:]) / 255.0
+        if t % EPISODE_LEN == 0:
+            buffer.begin_episode(state)
+        else:
+            buffer.add(t % 2, 1.0, state, (t + 1) % EPISODE_LEN == 0)
+
+
+if __name__ == "__main__":
+    capacity = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    directory = sys.argv[2] if len(sys.argv) > 2 else tempfile.mkdtemp()
+    batch_size, n = 32, 200
+
+    rng = np.random.default_rng(0)
+    memory = ReplayBuffer(capacity, STATE_SHAPE, scale=255.0, seed=0)
+    disk = MemmapReplayBuffer(directory, capacity, STATE_SHAPE, scale=255.0, seed=0)
+    fill(memory, capacity, rng)
+    np.copyto(disk.frames, memory.frames)
+    for name in ("actions", "rewards", "dones", "first", "has_next"):
+        np.copyto(getattr(disk, name), getattr(memory, name))
+    disk.cursor, disk.size, disk.num_transitions = memory.cursor, memory.size, memory.num_transitions
+    disk.flush()
+
+    # Sanity check : mêmes batchs pour les mêmes indices
+    idx = memory.sample_indices(batch_size)
+    for a, b in zip(memory.gather(idx), disk.gather(idx)):
+        assert np.array_equal(a, b)
+
+    states = np.empty((batch_size, int(np.prod(STATE_SHAPE))), dtype=np.float32)
+    next_states = np.empty_like(states)
+    t_memory = timeit.timeit(lambda: memory.sample(batch_size, states, next_states), number=n) / n
+    t_disk = timeit.timeit(lambda: disk.sample(batch_size, states, next_states), number=n) / n
+
+    size_mb = memory.frames.nbytes / 2**20
+    list_mb = capacity * 2 * states[0].nbytes / 2**20
+    print(f"capacité           : {capacity} frames, {size_mb:.0f} Mo (liste float32 : {list_mb:.0f} Mo)")
+    print(f"sample en mémoire  : {t_memory * 1e3:8.3f} ms")
+    print(f"sample memmap      : {t_disk * 1e3:8.3f} ms")
+
+    del disk
+    if len(sys.argv) <= 2:
+        shutil.rmtree(directory)
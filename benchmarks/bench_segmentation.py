@@ -0,0 +1,89 @@
+# benchmarks/bench_segmentation.py
+"""
+Segmentation par couleur de screen_capture_v2 : ancien chemin
+(array3d + resize + 4 × np.linalg.norm) contre table de correspondance.
+
+Lancement (depuis la racine du repo) :
+    python -m benchmarks.bench_segmentation [nb_frames]
+
+Deux mesures :
+- segmentation seule, sur l'image 84×84 : 4 × _detect_color contre
+  un passage dans color_lut + un masque par bit
+- frame complète : ancien process (capture + resize + détection) contre
+  process actuel (pixels échantillonnés en place + table)
+"""
+import os
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import cv2
+import numpy as np
+import pygame
+
+from config import WIDTH, HEIGHT
+from game.engine import GameEngine
+from game.renderer import render
+from capture.screen_capture_v2 import FrameProcessor
+
+
+def legacy_small(screen, target_size=(84, 84)):
+    frame = pygame.surfarray.array3d(screen)
+    frame = np.transpose(frame, (1, 0, 2))
+    return cv2.resize(frame, target_size, interpolation=cv2.INTER_NEAREST)
+
+
+def legacy_masks(processor, small):
+    image = small.astype(np.float32) / 255.0
+    return np.stack([
+        processor._detect_color(image, processor.color_player),
+        processor._detect_color(image, processor.color_obstacle),
+        processor._detect_color(image, processor.color_platform),
+        processor._detect_color(image, processor.color_ground),
+    ], axis=0)
+
+
+def lut_masks(processor, small, out):
+    codes = ((small[..., 0].astype(np.uint32) << 16)
+             | (small[..., 1].astype(np.uint32) << 8) | small[..., 2])
+    classes = processor.color_lut[codes]
+    for k in range(4):
+        np.not_equal(classes & (1 << k), 0, out=out[k])
+    return out
+
+
+def timed(fn, args_list, n):
+    start = time.perf_counter()
+    for i in range(n):
+        fn(*args_list[i % len(args_list)])
+    return (time.perf_counter() - start) / n
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    pygame.init()
+    processor = FrameProcessor()
+    engine = GameEngine()
+    screens = []
+    for t in range(300):
+        engine.update(t % 45 == 0, WIDTH)
+        if t % 15 == 0:
+            screen = pygame.Surface((WIDTH, HEIGHT))
+            render(screen, engine)
+            screens.append(screen)
+    smalls = [legacy_small(s) for s in screens]
+    out = np.empty((4, 84, 84), dtype=np.float32)
+
+    for small in smalls:
+        assert np.array_equal(legacy_masks(processor, small), lut_masks(processor, small, out))
+
+    t_norm = timed(lambda s: legacy_masks(processor, s), [(s,) for s in smalls], n)
+    t_lut = timed(lambda s: lut_masks(processor, s, out), [(s,) for s in smalls], n)
+    t_old = timed(lambda s: legacy_masks(processor, legacy_small(s)), [(s,) for s in screens], n)
+    t_new = timed(processor.process, [(s,) for s in screens], n)
+
+    print(f"segmentation 84x84 : norm {t_norm * 1e3:7.3f} ms | table {t_lut * 1e3:7.3f} ms "
+          f"| x{t_norm / t_lut:.1f}")
+    print(f"frame complète     : ancien {t_old * 1e3:7.3f} ms | process {t_new * 1e3:7.3f} ms "
+          f"| x{t_old / t_new:.1f}")
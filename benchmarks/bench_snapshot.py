@@ -0,0 +1,48 @@
+# benchmarks/bench_snapshot.py
+"""
+Compare le clonage d'un état de jeu : copy.deepcopy(GameEngine)
+contre engine.snapshot() / engine.restore(state).
+
+Lancement (depuis la racine du repo) :
+    python -m benchmarks.bench_snapshot [nb_repetitions]
+"""
+import copy
+import sys
+import timeit
+
+from config import WIDTH
+from game.engine import GameEngine
+
+
+def make_engine(n_steps=200):
+    engine = GameEngine()
+    for t in range(n_steps):
+        engine.update(t % 40 == 0, WIDTH)
+    return engine
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    engine = make_engine()
+    state = engine.snapshot()
+
+    # Sanity check : un branchement restauré rejoue exactement la suite
+    branch = copy.deepcopy(engine)
+    for _ in range(50):
+        branch.update(False, WIDTH)
+        engine.update(False, WIDTH)
+    after = engine.snapshot()
+    engine.restore(state)
+    for _ in range(50):
+        engine.update(False, WIDTH)
+    assert engine.snapshot() == after == branch.snapshot()
+    engine.restore(state)
+
+    t_deepcopy = timeit.timeit(lambda: copy.deepcopy(engine), number=n) / n
+    t_snapshot = timeit.timeit(engine.snapshot, number=n) / n
+    t_restore = timeit.timeit(lambda: engine.restore(state), number=n) / n
+
+    print(f"deepcopy          : {t_deepcopy * 1e6:8.2f} µs")
+    print(f"snapshot          : {t_snapshot * 1e6:8.2f} µs")
+    print(f"restore           : {t_restore * 1e6:8.2f} µs")
+    print(f"gain (snap+rest.) : {t_deepcopy / (t_snapshot + t_restore):8.1f}x")
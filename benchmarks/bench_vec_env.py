@@ -0,0 +1,53 @@
+# benchmarks/bench_vec_env.py
+"""
+Débit de la boucle d'action (sans apprentissage) avec K environnements :
+un forward batché (K, input_dim) + epsilon-greedy vectorisé par pas,
+contre K forwards (1, input_dim) + choose_action.
+
+Lancement (depuis la racine du repo) :
+    python -m benchmarks.bench_vec_env [nb_pas] [observation]
+"""
+import os
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import numpy as np
+
+from IA.DQN import QNetwork, choose_action, choose_actions
+from train import VectorEnv
+
+
+def run(env, net, n_steps, batched, rng):
+    states = env.reset()
+    actions = np.zeros(env.n_envs, dtype=np.int64)
+    start = time.perf_counter()
+    for _ in range(n_steps):
+        if batched:
+            choose_actions(net.forward(states), 0.1, rng, out=actions)
+        else:
+            for k in range(env.n_envs):
+                actions[k] = choose_action(net.forward(states[k])[0], 0.1)
+        states = env.step(actions, frame_skip=4)[0]
+    return env.n_envs * n_steps / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    observation = sys.argv[2] if len(sys.argv) > 2 else "semantic"
+    rng = np.random.default_rng(0)
+
+    net = None
+    for k in (1, 2, 4, 8, 16):
+        env = VectorEnv(k, headless=True, observation=observation)
+        if net is None:
+            net = QNetwork(env.states.shape[1])
+        start = time.perf_counter()
+        for _ in range(n // k):
+            net.forward(env.states)
+        forward_only = k * (n // k) / (time.perf_counter() - start)
+        sps_loop = run(env, net, n // k, batched=False, rng=rng)
+        sps_batch = run(env, net, n // k, batched=True, rng=rng)
+        print(f"K={k:2d} | forward seul {forward_only:8.0f} états/s | "
+              f"boucle (K forwards) {sps_loop:7.0f} pas/s | batché {sps_batch:7.0f} pas/s")
@@ -0,0 +1,151 @@
+# capture/feature_observer.py
+"""
+FeatureObserver - Observation basse dimension lue dans l'état du moteur
+
+Au lieu de pixels (28224 valeurs), un petit vecteur float32 :
+
+    [0] hauteur du joueur (0 en haut de l'écran, 1 posé au sol)
+    [1] vitesse verticale (/ |JUMP_VEL|)
+    [2] au sol (0 / 1)
+    puis pour chacun des num_objects prochains objets (plateformes et
+    piques confondus, par x croissant) :
+    [+0] distance en x du bord gauche de l'objet au joueur (/ WIDTH)
+    [+1] dessus de l'objet par rapport au haut du joueur (/ HEIGHT)
+    [+2] largeur (/ WIDTH)
+    [+3] 1 pour une plateforme, 0 pour un pique
+
+Un objet compte tant que son bord droit est devant le joueur (distance
+négative pour une plateforme sous le joueur) et qu'il est à l'écran
+(bord gauche avant horizon). Les emplacements suivent, par x, le premier
+objet dont le max cumulé des bords droits est devant le joueur ; un
+objet déjà dépassé parmi eux (bord droit avant celui d'un objet
+précédent plus large) laisse son emplacement vide : [1, 0, 0, 0].
+
+Les positions sont celles des collisions (cf. GameEngine.object_offset),
+calculées depuis le niveau compilé (LEVEL_DATA) et world_x : ni rendu,
+ni entités créées.
+"""
+
+from bisect import bisect_right
+
+import numpy as np
+
+from .frame_stack import FrameStack
+from game.level import LEVEL
+from game.batch_engine import PLAYER_X, GROUND_Y
+from config import WIDTH, HEIGHT, PLAYER_SIZE, JUMP_VEL
+
+PLAYER_FEATURES = 3
+OBJECT_FEATURES = 4
+EMPTY = (1.0, 0.0, 0.0, 0.0)
+
+
+class FeatureObserver:
+    """
+    Interchangeable avec FrameProcessor / SemanticRasterizer pour une
+    partie (process), et vectorisé sur un BatchGameEngine (observe_batch).
+    """
+
+    needs_pixels = False
+
+    def __init__(self, engine=None, num_objects=4, stack_size=1, horizon=WIDTH, level=LEVEL):
+        """
+        Paramètres :
+            engine      : GameEngine à observer (inutile pour observe_batch)
+            num_objects : nombre d'objets décrits devant le joueur
+            stack_size  : nombre de vecteurs temporels empilés (défaut: 1,
+                          la vitesse est déjà dans le vecteur)
+            horizon     : x écran au-delà duquel un objet est ignoré
+        """
+        self.engine = engine
+        self.num_objects = num_objects
+        self.horizon = horizon
+        self.size = PLAYER_FEATURES + OBJECT_FEATURES * num_objects
+        self.stack = FrameStack(stack_size, (self.size,))
+
+        # Plateformes et piques fusionnés, triés par x
+        p, o = level.platforms, level.obstacles
+        x = np.concatenate([p.x, o.x])
+        order = np.argsort(x, kind="stable")
+        self.x = x[order]
+        self.top = np.concatenate([p.top, o.top])[order]
+        self.w = np.concatenate([p.w, o.w])[order]
+        self.kind = np.concatenate([np.ones(len(p)), np.zeros(len(o))])[order]
+        # max cumulé des bords droits : croissant, donc searchsorted /
+        # bisect trouvent le premier objet pas encore dépassé
+        self.ends = np.maximum.accumulate(self.x + self.w) if len(x) else self.x
+
+        # Copies en listes pour le chemin scalaire (cf. AABBIndex)
+        self._ends = self.ends.tolist()
+        self._objects = list(zip(self.x.tolist(), self.top.tolist(),
+                                 self.w.tolist(), self.kind.tolist()))
+        self._k = np.arange(num_objects)
+
+    def process(self, screen=None):
+        """
+        Observation de la partie courante, vue (stack_size * size,) sur la
+        pile circulaire valable jusqu'au prochain appel. screen est ignoré.
+        """
+        self.observe(self.engine, out=self.stack.slot())
+        return self.stack.push().reshape(self.get_state_shape())
+
+    def observe(self, engine, out=None):
+        """Ecrit l'observation d'un GameEngine dans out (size,) et le retourne."""
+        if out is None:
+            out = np.empty(self.size, dtype=np.float32)
+        player = engine.player
+        y = player.rect.y
+        out[0] = y / (GROUND_Y - PLAYER_SIZE)
+        out[1] = player.vel_y / -JUMP_VEL
+        out[2] = player.on_ground
+
+        offset = engine.object_offset()
+        i = bisect_right(self._ends, PLAYER_X - offset)
+        n = len(self._objects)
+        base = PLAYER_FEATURES
+        for j in range(i, i + self.num_objects):
+            x, top, w, kind = self._objects[j] if j < n else EMPTY
+            if j < n and x + offset <= self.horizon and x + w + offset > PLAYER_X:
+                out[base:base + OBJECT_FEATURES] = (
+                    (x + offset - PLAYER_X) / WIDTH, (top - y) / HEIGHT, w / WIDTH, kind)
+            else:
+                out[base:base + OBJECT_FEATURES] = EMPTY
+            base += OBJECT_FEATURES
+        return out
+
+    def observe_batch(self, engine, out=None):
+        """
+        Ecrit les observations des N parties d'un BatchGameEngine dans out
+        (N, size) et le retourne.
+        """
+        n_envs = engine.n_envs
+        if out is None:
+            out = np.empty((n_envs, self.size), dtype=np.float32)
+        np.divide(engine.y, GROUND_Y - PLAYER_SIZE, out=out[:, 0])
+        np.divide(engine.vel_y, -JUMP_VEL, out=out[:, 1])
+        out[:, 2] = engine.on_ground
+
+        offset = WIDTH - engine.world_x
+        objects = out[:, PLAYER_FEATURES:].reshape(n_envs, self.num_objects, OBJECT_FEATURES)
+        if len(self.x) == 0:
+            objects[:] = EMPTY
+            return out
+        j = np.searchsorted(self.ends, PLAYER_X - offset, side="right")[:, None] + self._k
+        found = j < len(self.x)
+        np.minimum(j, len(self.x) - 1, out=j)
+        sx = self.x[j] + offset[:, None]
+        found &= sx <= self.horizon
+        found &= sx + self.w[j] > PLAYER_X       # pas encore dépassé
+        objects[..., 0] = np.where(found, (sx - PLAYER_X) / WIDTH, EMPTY[0])
+        objects[..., 1] = np.where(found, (self.top[j] - engine.y[:, None]) / HEIGHT, EMPTY[1])
+        objects[..., 2] = np.where(found, self.w[j] / WIDTH, EMPTY[2])
+        objects[..., 3] = np.where(found, self.kind[j], EMPTY[3])
+        return out
+
+    def reset(self):
+        """Vide la pile temporelle (à appeler au début de chaque épisode)."""
+        self.stack.reset()
+
+    def get_state_shape(self):
+        """Retourne la forme de l'observation."""
+        return (self.stack.stack_size * self.size,)
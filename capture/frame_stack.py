@@ -0,0 +1,67 @@
+# capture/frame_stack.py
+"""
+FrameStack - Pile temporelle circulaire de taille fixe
+
+Remplace le couple deque + np.stack / np.concatenate des FrameProcessor :
+le buffer contient 2 × stack_size emplacements et chaque frame est écrite
+deux fois (k et k + stack_size). La pile courante, de la plus ancienne à
+la plus récente, est alors toujours la tranche contiguë
+buffer[pos : pos + stack_size] : une vue, sans copie.
+
+Insertion en O(1) (une frame recopiée), reset en O(1) (un compteur).
+"""
+
+import numpy as np
+
+
+class FrameStack:
+
+    def __init__(self, stack_size, frame_shape, dtype=np.float32):
+        self.stack_size = stack_size
+        self.frame_shape = tuple(frame_shape)
+        self._buffer = np.zeros((2 * stack_size,) + self.frame_shape, dtype=dtype)
+        self._pos = 0       # emplacement de la prochaine frame
+        self._filled = False
+
+    def slot(self):
+        """
+        Emplacement (vue) où écrire directement la prochaine frame,
+        à valider ensuite par push() sans argument.
+        """
+        return self._buffer[self._pos]
+
+    def push(self, frame=None):
+        """
+        Ajoute frame (ou la frame déjà écrite dans slot()) et retourne
+        la pile courante.
+
+        Juste après reset(), la frame est dupliquée dans toute la pile
+        (comme le remplissage initial des anciennes deques).
+        """
+        buf, p, n = self._buffer, self._pos, self.stack_size
+        if frame is not None:
+            buf[p] = frame
+        if self._filled:
+            buf[p + n] = buf[p]
+        else:
+            for k in range(2 * n):
+                if k != p:
+                    buf[k] = buf[p]
+            self._filled = True
+        self._pos = (p + 1) % n
+        return self.window()
+
+    def window(self):
+        """
+        Pile courante (stack_size, *frame_shape), de la plus ancienne à la
+        plus récente. C'est une vue : elle change au prochain push.
+        """
+        return self._buffer[self._pos:self._pos + self.stack_size]
+
+    def latest(self):
+        """Frame la plus récente (vue)."""
+        return self._buffer[self._pos + self.stack_size - 1]
+
+    def reset(self):
+        """Début d'épisode : la prochaine frame remplira toute la pile."""
+        self._filled = False
@@ -1,28 +1,84 @@
 # capture/screen_capture.py
+import sys
 import numpy as np
 import pygame.surfarray
-from collections import deque
 import cv2
+from .frame_stack import FrameStack
+
+
+def is_xrgb32(screen):
+    """Surface 32 bits, octets B, G, R, X en mémoire (cas usuel de pygame)."""
+    return (screen.get_bytesize() == 4 and sys.byteorder == "little"
+            and screen.get_shifts()[:3] == (16, 8, 0)
+            and screen.get_pitch() == 4 * screen.get_width())
+
 
 class FrameProcessor:
+    needs_pixels = True  # lit l'écran : il doit être rendu avant process
+
     def __init__(self, stack_size=4, width=84, height=84):
-        self.stack = deque(maxlen=stack_size)
+        self.stack = FrameStack(stack_size, (height, width))
         self.target_size = (width, height)
 
+        # Buffers réutilisés, alloués à la première frame (taille de l'écran)
+        self._screen_size = None
+        self._gray = None                                   # (H, W) uint8
+        self._rgb = None                                    # (H, W, 3), chemin générique
+        self._small = np.empty((height, width), dtype=np.uint8)
+        self._frame = np.empty((height, width), dtype=np.float32)
+
     def process(self, screen):
-        # Capture
-        frame = pygame.surfarray.array3d(screen)
-        frame = np.transpose(frame, (1, 0, 2))[:, :, ::-1]  # RGB
+        # La frame est écrite directement dans la pile circulaire ; le
+        # résultat est une vue valable jusqu'au prochain appel.
+        self.grab(screen, out=self.stack.slot())
+        return self.stack.push()  # (4, 84, 84)
+
+    def grab(self, screen, out=None):
+        """
+        Capture + niveaux de gris + réduction, sans copie de l'écran et sans
+        allocation une fois les buffers créés. Ecrit dans out (défaut :
+        buffer interne réutilisé) une image (84, 84) float32 dans [0, 1].
+
+        Même résultat, au bit près, que l'ancien chemin array3d -> RGB ->
+        cv2.cvtColor(RGB2GRAY) -> cv2.resize(INTER_AREA) -> / 255.
+        """
+        if out is None:
+            out = self._frame
+        size = screen.get_size()
+        if size != self._screen_size:
+            self._screen_size = size
+            self._gray = np.empty((size[1], size[0]), dtype=np.uint8)
+            self._rgb = None
 
-        # Grayscale + resize
-        gray = cv2.cvtColor(frame, cv2.COLOR_RGB2GRAY)
-        gray = cv2.resize(gray, self.target_size, interpolation=cv2.INTER_AREA)
-        gray = gray.astype(np.float32) / 255.0
+        if is_xrgb32(screen):
+            # Mémoire de l'écran lue en place : lignes de pixels B, G, R, X.
+            # L'ancien code inversait les canaux avant RGB2GRAY : le poids
+            # du rouge s'appliquait au bleu. Lire BGRX comme du RGBA donne
+            # exactement la même conversion.
+            pixels = np.asarray(screen.get_view("2")).T.view(np.uint8)
+            pixels = pixels.reshape(size[1], size[0], 4)
+            cv2.cvtColor(pixels, cv2.COLOR_RGBA2GRAY, dst=self._gray)
+        else:
+            # Autres formats : vue pixels3d recopiée dans un buffer réutilisé
+            if self._rgb is None:
+                self._rgb = np.empty((size[1], size[0], 3), dtype=np.uint8)
+            pixels = pygame.surfarray.pixels3d(screen)
+            np.copyto(self._rgb, pixels.transpose(1, 0, 2)[:, :, ::-1])
+            cv2.cvtColor(self._rgb, cv2.COLOR_RGB2GRAY, dst=self._gray)
+        del pixels  # libère le verrou posé sur la surface par la vue
 
-        self.stack.append(gray)
+        cv2.resize(self._gray, self.target_size, dst=self._small, interpolation=cv2.INTER_AREA)
+        # conversion puis division sur place (un divide mixte uint8/float32
+        # passerait par un buffer de conversion temporaire)
+        np.copyto(out, self._small)
+        np.divide(out, np.float32(255.0), out=out)
+        return out
 
-        # Pad si pas assez de frames
-        while len(self.stack) < self.stack.maxlen:
-            self.stack.append(gray)
+    def reset(self):
+        """Vide la pile temporelle (à appeler au début de chaque épisode)."""
+        self.stack.reset()
 
-        return np.stack(self.stack, axis=0)  # (4, 84, 84)
\ No newline at end of file
+    def get_state_shape(self):
+        """Retourne la forme de la matrice de sortie."""
+        h, w = self.target_size[1], self.target_size[0]
+        return (self.stack.stack_size, h, w)
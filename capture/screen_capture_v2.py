@@ -11,8 +11,40 @@ exploitant les couleurs distinctes du jeu Geometry Dash recréé.
 
 import numpy as np
 import pygame
-import cv2
-from collections import deque
+from functools import lru_cache
+
+from .frame_stack import FrameStack
+from .screen_capture import is_xrgb32
+
+
+@lru_cache(maxsize=4)
+def build_color_lut(colors, tolerance):
+    """
+    Table de correspondance couleur 24 bits -> classes.
+    
+    Arguments :
+        colors    : tuple de couleurs RGB normalisées (comme color_player...)
+        tolerance : distance maximale (comme color_tolerance)
+    
+    Retour :
+        np.ndarray uint8 de taille 2**24, indexée par (r << 16) | (g << 8) | b :
+        le bit k vaut 1 si le pixel est détecté pour colors[k]. Les calculs
+        flottants sont exactement ceux de _detect_color (mêmes masques).
+    """
+    # Valeur normalisée de chaque niveau 0..255, en float32 comme l'image
+    levels = np.arange(256, dtype=np.uint8).astype(np.float32) / 255.0
+    lut = np.zeros((256, 256, 256), dtype=np.uint8)
+    for k, color in enumerate(colors):
+        # Carrés des écarts par canal, en float64 comme image - target_color
+        sq = []
+        for c in range(3):
+            d = levels - np.float64(color[c])
+            sq.append(d * d)
+        sq_gb = sq[1][:, None]
+        for r in range(256):
+            dist = np.sqrt((sq[0][r] + sq_gb) + sq[2][None, :])  # (g, b)
+            lut[r] |= (dist < tolerance).astype(np.uint8) << k
+    return lut.reshape(-1)
 
 
 class FrameProcessor:
@@ -29,6 +61,8 @@ class FrameProcessor:
     [0] joueur, [1] obstacles, [2] plateformes, [3] sol
     """
     
+    needs_pixels = True  # lit l'écran : il doit être rendu avant process
+    
     def __init__(self, stack_size=4, width=84, height=84):
         """
         Paramètres :
@@ -36,7 +70,7 @@ class FrameProcessor:
             width      : Largeur de la matrice de sortie (défaut: 84)
             height     : Hauteur de la matrice de sortie (défaut: 84)
         """
-        self.stack = deque(maxlen=stack_size)
+        self.stack = FrameStack(stack_size, (4, height, width))
         self.target_size = (width, height)
         
         # Couleurs de référence (normalisées entre 0 et 1)
@@ -47,6 +81,21 @@ class FrameProcessor:
         
         # Tolérance pour la détection de couleur (ajuster si nécessaire)
         self.color_tolerance = 0.15
+        
+        # Table couleur -> classes (bit k = masque k), partagée entre instances
+        self.color_lut = build_color_lut(
+            tuple(tuple(float(v) for v in color) for color in (
+                self.color_player, self.color_obstacle,
+                self.color_platform, self.color_ground)),
+            self.color_tolerance)
+        
+        # Pixels source lus par cv2.INTER_NEAREST (échelle 1 / (dst / src)),
+        # calculés à la première frame (taille de l'écran)
+        self._screen_size = None
+        self._pixel_index = None
+        self._codes = np.empty((height, width), dtype=np.uint32)
+        self._classes = np.empty((height, width), dtype=np.uint8)
+        self._bits = np.empty((height, width), dtype=np.uint8)
     
     
     def process(self, screen):
@@ -58,45 +107,63 @@ class FrameProcessor:
         
         Retour :
             np.ndarray de shape (16, 84, 84) et dtype float32
+            (vue sur la pile circulaire, valable jusqu'au prochain appel)
         """
-        # Étape 1 : Conversion Pygame Surface → numpy array
-        frame = pygame.surfarray.array3d(screen)     # (W, H, 3) BGR
-        frame = np.transpose(frame, (1, 0, 2))       # (H, W, 3) RGB
-        
-        # Étape 2 : Redimensionnement à 84×84
-        small = cv2.resize(frame, self.target_size, interpolation=cv2.INTER_NEAREST)
-        small = small.astype(np.float32) / 255.0     # Normalisation [0, 1]
+        # Étape 1 : Lecture des seuls pixels gardés par le redimensionnement
+        # à 84×84 (plus proche voisin), en codes RGB 24 bits
+        codes = self._sample_codes(screen)
         
-        # Étape 3 : Détection des 4 types d'éléments par couleur
-        mask_player = self._detect_color(small, self.color_player)
-        mask_obstacle = self._detect_color(small, self.color_obstacle)
-        mask_platform = self._detect_color(small, self.color_platform)
-        mask_ground = self._detect_color(small, self.color_ground)
+        # Étape 2 : Classes de chaque pixel en un seul passage dans la table
+        np.take(self.color_lut, codes, out=self._classes)
         
-        # Étape 4 : Empilement des 4 masques en une "frame sémantique"
-        semantic_frame = np.stack([
-            mask_player,
-            mask_obstacle,
-            mask_platform,
-            mask_ground
-        ], axis=0).astype(np.float32)  # Shape: (4, 84, 84)
+        # Étape 3 et 4 : Un masque par bit, écrit directement dans la pile
+        # temporelle circulaire [joueur, obstacles, plateformes, sol]
+        semantic_frame = self.stack.slot()  # Shape: (4, 84, 84)
+        for k in range(4):
+            np.bitwise_and(self._classes, 1 << k, out=self._bits)
+            np.not_equal(self._bits, 0, out=semantic_frame[k])
         
-        # Étape 5 : Ajout dans la pile temporelle
-        self.stack.append(semantic_frame)
+        # Étape 5 : Ajout dans la pile (dupliquée au début du jeu)
+        stack = self.stack.push()
         
-        # Étape 6 : Remplissage initial (duplication au début du jeu)
-        while len(self.stack) < self.stack.maxlen:
-            self.stack.append(semantic_frame)
-        
-        # Étape 7 : Concaténation temporelle finale
-        state = np.concatenate(list(self.stack), axis=0)
+        # Étape 6 : Vue (16, 84, 84) sur la pile, sans concaténation
+        state = stack.reshape(self.get_state_shape())
         
         return state  # Shape: (16, 84, 84)
     
     
+    def _sample_codes(self, screen):
+        """
+        Pixels de l'écran échantillonnés comme cv2.resize(INTER_NEAREST),
+        sous forme de codes (r << 16) | (g << 8) | b, shape (84, 84) uint32.
+        """
+        w, h = screen.get_size()
+        if (w, h) != self._screen_size:
+            self._screen_size = (w, h)
+            tw, th = self.target_size
+            cols = np.minimum(np.floor(np.arange(tw) * (1 / (tw / w))), w - 1).astype(np.intp)
+            rows = np.minimum(np.floor(np.arange(th) * (1 / (th / h))), h - 1).astype(np.intp)
+            self._cols, self._rows = cols, rows
+            self._pixel_index = rows[:, None] * w + cols[None, :]
+        
+        if is_xrgb32(screen):
+            # Mémoire de l'écran lue en place : un uint32 0xXXRRGGBB par pixel
+            pixels = np.asarray(screen.get_view("2")).T.reshape(-1)
+            np.take(pixels, self._pixel_index, out=self._codes)
+            del pixels  # libère le verrou posé sur la surface par la vue
+            np.bitwise_and(self._codes, 0xFFFFFF, out=self._codes)
+        else:
+            frame = pygame.surfarray.pixels3d(screen)  # (W, H, 3) RGB, vue
+            small = frame[self._cols[None, :], self._rows[:, None]].astype(np.uint32)
+            del frame
+            self._codes[...] = (small[..., 0] << 16) | (small[..., 1] << 8) | small[..., 2]
+        return self._codes
+    
+    
     def _detect_color(self, image, target_color):
         """
         Détecte les pixels correspondant à une couleur cible.
+        (Calcul de référence, remplacé dans process par color_lut.)
         
         Arguments :
             image        : Image RGB normalisée (H, W, 3)
@@ -112,12 +179,12 @@ class FrameProcessor:
     
     def reset(self):
         """Vide la pile temporelle (à appeler au début de chaque épisode)."""
-        self.stack.clear()
+        self.stack.reset()
     
     
     def get_state_shape(self):
         """Retourne la forme de la matrice de sortie."""
-        channels = self.stack.maxlen * 4
+        channels = self.stack.stack_size * 4
         h, w = self.target_size[1], self.target_size[0]
         return (channels, h, w)
 
@@ -0,0 +1,122 @@
+# capture/semantic_rasterizer.py
+"""
+SemanticRasterizer - Masques sémantiques construits directement depuis le moteur
+
+Même sortie que capture/screen_capture_v2.FrameProcessor, (16, 84, 84) =
+4 masques × 4 frames, mais sans dessiner l'écran 900×500, sans le copier,
+sans redimensionnement ni détection de couleur : les rectangles des
+entités sont rasterisés directement à la résolution cible, dans des
+buffers préalloués.
+
+L'échantillonnage reproduit le cv2.INTER_NEAREST de la v2 (le pixel
+(r, c) de la sortie correspond au pixel source (r·H/h, c·W/w) arrondi
+vers le bas), et l'ordre de dessin est celui de game/renderer.render.
+Différence volontaire : le masque "sol" ne contient que le sol (la v2 y
+classait aussi le fond, trop proche en couleur).
+"""
+
+import numpy as np
+
+from .frame_stack import FrameStack
+from config import WIDTH, HEIGHT, GROUND_HEIGHT
+
+# Valeurs de la carte de labels (0 = fond), dans l'ordre des canaux
+PLAYER, OBSTACLE, PLATFORM, GROUND = 1, 2, 3, 4
+
+
+class SemanticRasterizer:
+    """
+    Remplace FrameProcessor (v2) quand on a accès au GameEngine.
+
+    Chaque groupe de 4 canaux contient :
+    [0] joueur, [1] obstacles, [2] plateformes, [3] sol
+    """
+
+    needs_pixels = False
+
+    def __init__(self, engine, stack_size=4, width=84, height=84, dtype=np.float32):
+        """
+        Paramètres :
+            engine     : GameEngine à observer
+            stack_size : Nombre de frames temporelles à conserver (défaut: 4)
+            width      : Largeur de la matrice de sortie (défaut: 84)
+            height     : Hauteur de la matrice de sortie (défaut: 84)
+            dtype      : np.float32 ou np.uint8
+        """
+        self.engine = engine
+        self.stack = FrameStack(stack_size, (4, height, width), dtype=dtype)
+        self.target_size = (width, height)
+        self.dtype = dtype
+
+        # Coordonnées source échantillonnées par chaque colonne / ligne
+        # (même calcul que cv2 : échelle inverse 1 / (dst / src))
+        self.col_src = np.minimum(np.floor(np.arange(width) * (1 / (width / WIDTH))), WIDTH - 1)
+        self.row_src = np.minimum(np.floor(np.arange(height) * (1 / (height / HEIGHT))), HEIGHT - 1)
+
+        # Buffer réutilisé à chaque frame
+        self.labels = np.zeros((height, width), dtype=np.uint8)
+        self.ground_rows = np.searchsorted(self.row_src, HEIGHT - GROUND_HEIGHT)
+
+    def process(self, screen=None):
+        """
+        Rasterise l'état courant du moteur et retourne la matrice d'état.
+        screen est ignoré (présent pour rester interchangeable avec FrameProcessor).
+
+        Retour :
+            np.ndarray de shape (16, 84, 84), vue sur la pile circulaire
+            valable jusqu'au prochain appel
+        """
+        self.rasterize(self.engine, out=self.stack.slot())
+        return self.stack.push().reshape(self.get_state_shape())
+
+    def rasterize(self, engine, out=None):
+        """
+        Ecrit les 4 masques de l'état courant dans out (alloué si absent)
+        et le retourne. Shape (4, h, w).
+        """
+        if out is None:
+            out = np.empty((4,) + self.labels.shape, dtype=self.dtype)
+        labels = self.labels
+        labels.fill(0)
+        labels[self.ground_rows:] = GROUND
+
+        level = engine.level
+        for x, top, w, h, _ in engine.visible_boxes(level.platforms):
+            rows, cols = self._span(x, top, w, h)
+            labels[rows, cols] = PLATFORM
+        for x, top, w, h, _ in engine.visible_boxes(level.obstacles):
+            self._triangle(x, top, w, h)
+        player = engine.player
+        if player.alive:  # mort, le joueur change de couleur (invisible pour la v2)
+            r = player.rect
+            rows, cols = self._span(r.x, r.y, r.width, r.height)
+            labels[rows, cols] = PLAYER
+
+        for k in range(4):
+            np.equal(labels, k + 1, out=out[k], casting="unsafe")
+        return out
+
+    def _span(self, x, y, w, h):
+        """Lignes et colonnes de sortie dont le point échantillonné est dans le rect."""
+        c0, c1 = np.searchsorted(self.col_src, (x, x + w))
+        r0, r1 = np.searchsorted(self.row_src, (y, y + h))
+        return slice(r0, r1), slice(c0, c1)
+
+    def _triangle(self, x, top, w, h):
+        """Pique : triangle (gauche, bas), (droite, bas), (centre, haut)."""
+        rows, cols = self._span(x, top, w, h)
+        if rows.start >= rows.stop or cols.start >= cols.stop:
+            return
+        half = (self.row_src[rows, None] - top) * (w / (2 * h))
+        inside = np.abs(self.col_src[cols] - (x + w // 2)) <= half
+        self.labels[rows, cols][inside] = OBSTACLE
+
+    def reset(self):
+        """Vide la pile temporelle (à appeler au début de chaque épisode)."""
+        self.stack.reset()
+
+    def get_state_shape(self):
+        """Retourne la forme de la matrice de sortie."""
+        channels = self.stack.stack_size * 4
+        h, w = self.target_size[1], self.target_size[0]
+        return (channels, h, w)
@@ -1,6 +1,4 @@
 # config.py
-import pygame
-
 # --- Dimensions & Physique ---
 WIDTH, HEIGHT = 900, 500
 FPS = 60
@@ -10,6 +8,9 @@ PLAYER_SIZE = 40
 GROUND_HEIGHT = 80
 OBSTACLE_SPEED = 7
 
+# --- Agent ---
+FRAME_SKIP = 4  # l'IA décide une fois toutes les FRAME_SKIP étapes de physique
+
 # --- Couleurs ---
 BG = (25, 25, 35)
 GROUND_COLOR = (40, 40, 55)
@@ -19,5 +20,22 @@ PLATFORM_COLOR = (100, 180, 255)
 TEXT_COLOR = (230, 230, 230)
 
 # --- Police ---
-pygame.font.init()
-FONT = pygame.font.Font(None, 24)
\ No newline at end of file
+# Chargée au premier usage : importer config (physique, réseaux, workers
+# sans écran) ne doit ni importer pygame ni initialiser SDL_ttf.
+_font = None
+
+
+def get_font():
+    global _font
+    if _font is None:
+        import pygame
+        pygame.font.init()
+        _font = pygame.font.Font(None, 24)
+    return _font
+
+
+def __getattr__(name):
+    # compatibilité : from config import FONT
+    if name == "FONT":
+        return get_font()
+    raise AttributeError(f"module 'config' has no attribute {name!r}")
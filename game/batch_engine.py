@@ -0,0 +1,170 @@
+# game/batch_engine.py
+"""
+BatchGameEngine - N parties indépendantes avancées en une seule fois
+
+Même physique que GameEngine, mais l'état des N joueurs est rangé en
+"structure de tableaux" NumPy (y, vel_y, on_ground, alive, world_x, ...)
+et les collisions avec la géométrie statique de LEVEL_DATA sont faites
+par opérations vectorisées sur le niveau compilé (game/level.py). Les résultats par partie sont identiques,
+au bit près, à ceux du moteur scalaire.
+
+Utilisation : rollouts en masse (recherche par population, collecte
+de transitions DQN en batch).
+"""
+
+import numpy as np
+
+from .level import LEVEL, LEVEL_END
+from config import (
+    OBSTACLE_SPEED, HEIGHT, GROUND_HEIGHT, PLAYER_SIZE, GRAVITY, JUMP_VEL
+)
+
+PLAYER_X = 100                       # Player().rect.x ne bouge jamais
+GROUND_Y = HEIGHT - GROUND_HEIGHT    # haut du sol
+
+
+def round_like_rect(v):
+    """
+    Arrondi appliqué par pygame.Rect quand on lui affecte un float
+    (lround : demi-entiers arrondis en s'éloignant de zéro).
+    """
+    t = np.trunc(v)
+    return t + np.copysign(np.abs(v - t) >= 0.5, v)
+
+
+class BatchGameEngine:
+    """
+    N parties de GameEngine en parallèle.
+
+    Etat (tableaux de taille N) :
+        y, vel_y, on_ground, alive, world_x, score, game_over, level_index
+
+    y est le haut du rect du joueur (valeurs entières stockées en float64,
+    comme rect.y après l'arrondi de pygame).
+    """
+
+    def __init__(self, n_envs, level=LEVEL):
+        self.n_envs = n_envs
+        self.level = level
+
+        n = n_envs
+        self.y = np.zeros(n, dtype=np.float64)
+        self.vel_y = np.zeros(n, dtype=np.float64)
+        self.on_ground = np.zeros(n, dtype=bool)
+        self.alive = np.zeros(n, dtype=bool)
+        self.world_x = np.zeros(n, dtype=np.int64)
+        self.score = np.zeros(n, dtype=np.int64)
+        self.game_over = np.zeros(n, dtype=bool)
+        self.level_index = np.zeros(n, dtype=np.int64)
+        self.reset()
+
+    def reset(self, mask=None):
+        """Remet à zéro toutes les parties, ou seulement celles de mask."""
+        if mask is None:
+            mask = slice(None)
+        self.y[mask] = GROUND_Y - PLAYER_SIZE
+        self.vel_y[mask] = 0
+        self.on_ground[mask] = False
+        self.alive[mask] = True
+        self.world_x[mask] = 0
+        self.score[mask] = 0
+        self.game_over[mask] = False
+        self.level_index[mask] = 0
+
+    def update(self, jump_pressed, screen_width):
+        """
+        Equivalent de GameEngine.update pour les N parties.
+
+        jump_pressed : tableau booléen (N,) (ou booléen partagé)
+        """
+        running = ~self.game_over
+        np.add(self.world_x, OBSTACLE_SPEED, out=self.world_x, where=running)
+        self.level_index = np.searchsorted(
+            self.level.spawn_x, self.world_x + screen_width, side="right")
+
+        # Player.update : gravité puis collisions (joueurs vivants seulement)
+        active = running & self.alive
+        np.add(self.vel_y, GRAVITY, out=self.vel_y, where=active)
+        self.y = np.where(active, round_like_rect(self.y + self.vel_y), self.y)
+        self.on_ground &= ~active
+
+        # Position écran des objets au moment des collisions : un objet
+        # apparu à world_x0 en W + (x - world_x0) a reculé de la même
+        # quantité que world_x depuis, d'où W + x - world_x. Les objets
+        # sortis de l'écran à gauche ne peuvent plus toucher le joueur.
+        # active est mis à jour en place : un joueur mort saute la suite.
+        offset = (screen_width - self.world_x)[:, None]
+        self._collide_platforms(active, offset)
+        self._collide_obstacles(active, offset)
+
+        # Sol
+        landed = active & (self.y + PLAYER_SIZE >= GROUND_Y)
+        self.y[landed] = GROUND_Y - PLAYER_SIZE
+        self.vel_y[landed] = 0
+        self.on_ground |= landed
+
+        # Saut (après les collisions, comme GameEngine)
+        jump = running & np.asarray(jump_pressed, dtype=bool) & self.on_ground & self.alive
+        self.vel_y[jump] = JUMP_VEL
+        self.on_ground &= ~jump
+
+        self.game_over |= running & ~self.alive
+        np.add(self.score, 1, out=self.score, where=running)
+
+    def _window(self, index, active, offset):
+        """
+        Colonnes de index à tester : union des fenêtres autour du joueur
+        des parties actives, puis test exact du recouvrement en x.
+        """
+        if not active.any() or len(index) == 0:
+            return None, None
+        x0 = PLAYER_X - offset[active, 0]
+        lo, hi = index.window_array(x0.min(), x0.max() + PLAYER_SIZE)
+        if lo >= hi:
+            return None, None
+        cols = slice(lo, hi)
+        sx = index.x[cols] + offset
+        hit_x = (sx < PLAYER_X + PLAYER_SIZE) & (sx + index.w[cols] > PLAYER_X)
+        hit_x &= active[:, None]
+        return cols, hit_x
+
+    def _collide_platforms(self, active, offset):
+        """
+        Les plateformes sont testées une à une dans l'ordre du niveau :
+        un atterrissage déplace le joueur avant le test de la suivante,
+        et la première collision mortelle arrête tout (return du scalaire).
+        """
+        platforms = self.level.platforms
+        cols, hit_x = self._window(platforms, active, offset)
+        if cols is None:
+            return
+        for j in np.flatnonzero(hit_x.any(axis=0)):
+            top = platforms.top[cols.start + j]
+            h = platforms.h[cols.start + j]
+            hit = active & hit_x[:, j] & (self.y < top + h) & (self.y + PLAYER_SIZE > top)
+            land = hit & (self.vel_y > 0) & (self.y + PLAYER_SIZE <= top + 10)
+            self.y[land] = top - PLAYER_SIZE
+            self.vel_y[land] = 0
+            self.on_ground |= land
+            dead = hit & ~land
+            self.alive &= ~dead
+            active &= ~dead
+
+    def _collide_obstacles(self, active, offset):
+        obstacles = self.level.obstacles
+        cols, hit_x = self._window(obstacles, active, offset)
+        if cols is None:
+            return
+        top = obstacles.top[cols]
+        y = self.y[:, None]
+        hit = hit_x & (y < top + obstacles.h[cols]) & (y + PLAYER_SIZE > top)
+        dead = active & hit.any(axis=1)
+        self.alive &= ~dead
+        active &= ~dead
+
+    def is_done(self):
+        return self.game_over | (self.world_x > LEVEL_END)
+
+    def get_reward(self):
+        return np.where(~self.alive, -100.0,
+                        np.where(self.world_x > LEVEL_END, 1000.0, 0.1))
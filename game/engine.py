@@ -1,44 +1,88 @@
 # game/engine.py
 from .entities import Player, Platform, Obstacle
-from .level import LEVEL_DATA
-from config import OBSTACLE_SPEED, WIDTH, HEIGHT, FPS
+from .level import LEVEL, LEVEL_END
+from config import OBSTACLE_SPEED, WIDTH, HEIGHT, FPS, PLAYER_SIZE
+
 class GameEngine:
     def __init__(self):
         self.player = Player()
-        self.obstacles = []
-        self.platforms = []
+        self.level = LEVEL
         self.level_index = 0
         self.world_x = 0
+        self.screen_width = WIDTH
         self.score = 0
         self.game_over = False
-        self.id = True 
+        self.id = True
 
     def reset(self):
         self.__init__()
 
+    def snapshot(self):
+        """
+        Etat complet de la partie sous forme de tuple immuable (scalaires).
+        Le niveau compilé est partagé et statique : rien d'autre à copier.
+        """
+        p = self.player
+        return (p.rect.y, p.vel_y, p.on_ground, p.alive,
+                self.level_index, self.world_x, self.screen_width,
+                self.score, self.game_over)
+
+    def restore(self, state):
+        """Recharge un état renvoyé par snapshot()."""
+        p = self.player
+        (p.rect.y, p.vel_y, p.on_ground, p.alive,
+         self.level_index, self.world_x, self.screen_width,
+         self.score, self.game_over) = state
+
     def spawn_objects(self, screen_width):
-        while (self.level_index < len(LEVEL_DATA) and 
-               LEVEL_DATA[self.level_index]["x"] <= self.world_x + screen_width):
-            data = LEVEL_DATA[self.level_index]
-            spawn_x = screen_width + (data["x"] - self.world_x)
-            obj_id = data.get("id")
-            if self.id:
-                if data["type"] == "obstacle":
-                    self.obstacles.append(Obstacle(spawn_x, OBSTACLE_SPEED, obj_id=obj_id))
-                elif data["type"] == "obstacle_air":
-                    self.obstacles.append(Obstacle(spawn_x, OBSTACLE_SPEED, y=data["y"], obj_id=obj_id))
-                elif data["type"] == "platform":
-                    self.platforms.append(Platform(spawn_x, data["y"], data["width"], OBSTACLE_SPEED, obj_id=obj_id))
-                self.level_index += 1
-            elif self.id==False:
-                if data["type"] == "obstacle":
-                    self.obstacles.append(Obstacle(spawn_x, OBSTACLE_SPEED))
-                elif data["type"] == "obstacle_air":
-                    self.obstacles.append(Obstacle(spawn_x, OBSTACLE_SPEED, y=data["y"]))
-                elif data["type"] == "platform":
-                    self.platforms.append(Platform(spawn_x, data["y"], data["width"], OBSTACLE_SPEED))
-                self.level_index += 1
+        # Le niveau est compilé une fois (game/level.py) : on avance
+        # seulement le nombre d'objets apparus, sans créer d'entités.
+        self.level_index = self.level.spawned_count(self.world_x + screen_width)
+        self.screen_width = screen_width
+
+    def object_offset(self):
+        """
+        Décalage monde -> écran des objets au moment des collisions.
+
+        Un objet apparu à world_x0 en W + (x - world_x0) recule de
+        OBSTACLE_SPEED par update, comme world_x : il est en W + x - world_x.
+        """
+        return self.screen_width - self.world_x
 
+    @property
+    def platforms(self):
+        """Plateformes visibles (entités créées à la demande, pour le rendu)."""
+        return self._visible(self.level.platforms, lambda x, top, w, obj_id:
+                             Platform(x, top, w, OBSTACLE_SPEED, obj_id=obj_id))
+
+    @property
+    def obstacles(self):
+        """Obstacles visibles (entités créées à la demande, pour le rendu)."""
+        return self._visible(self.level.obstacles, lambda x, top, w, obj_id:
+                             Obstacle(x, OBSTACLE_SPEED, y=top + PLAYER_SIZE, obj_id=obj_id))
+
+    def _visible(self, index, make):
+        entities = []
+        for x, top, w, h, obj_id in self.visible_boxes(index):
+            obj_id = obj_id if self.id and obj_id >= 0 else None
+            entities.append(make(x, top, w, obj_id))
+        return entities
+
+    def visible_boxes(self, index):
+        """
+        (x_écran, top, w, h, id) des objets de index présents à l'écran,
+        à la position où le rendu les dessine.
+        """
+        # Après update, les entités ont reculé une fois de plus que lors des
+        # collisions ; celles dont le bord droit est passé sous 0 ont disparu.
+        if self.level_index == 0:
+            return
+        offset = self.object_offset() - OBSTACLE_SPEED
+        right = self.world_x + self.screen_width + 1
+        for i in index.window(-offset - 1, right):
+            x, top, w, h = index.boxes[i]
+            if x + offset + w >= 0:
+                yield x + offset, top, w, h, index.id_list[i]
 
     def update(self, jump_pressed, screen_width):
         if self.game_over:
@@ -47,12 +91,7 @@ class GameEngine:
         self.world_x += OBSTACLE_SPEED
         self.spawn_objects(screen_width)
 
-        self.player.update(self.platforms, self.obstacles)
-        for o in self.obstacles: o.update()
-        for p in self.platforms: p.update()
-
-        self.obstacles = [o for o in self.obstacles if not o.off_screen()]
-        self.platforms = [p for p in self.platforms if not p.off_screen()]
+        self.player.update(self.level, self.object_offset())
 
         if jump_pressed:
             self.player.jump()
@@ -63,11 +102,11 @@ class GameEngine:
         self.score += 1
 
     def is_done(self):
-        return self.game_over or self.world_x > 9500
+        return self.game_over or self.world_x > LEVEL_END
 
     def get_reward(self):
         if not self.player.alive:
             return -100
-        if self.world_x > 9500:
+        if self.world_x > LEVEL_END:
             return 1000
-        return 0.1
\ No newline at end of file
+        return 0.1
@@ -1,7 +1,6 @@
 # game/entities.py
 import pygame
 from config import *
-from config import FONT
 
 
 class Player:
@@ -20,19 +19,28 @@ class Player:
         self.vel_y += GRAVITY
         self.rect.y += self.vel_y
 
-    def handle_collisions(self, platforms, obstacles):
+    def handle_collisions(self, level, offset):
+        """
+        level  : CompiledLevel (AABB monde triées par x)
+        offset : décalage monde -> écran des objets (GameEngine.object_offset)
+        Seuls les objets de la fenêtre autour du joueur sont testés.
+        """
         self.on_ground = False
-        for p in platforms:
-            if self.rect.colliderect(p.rect):
-                if self.vel_y > 0 and self.rect.bottom <= p.rect.top + 10:
-                    self.rect.bottom = p.rect.top
+        x0, x1 = self.rect.left - offset, self.rect.right - offset
+        platforms, obstacles = level.platforms, level.obstacles
+        for i in platforms.window(x0, x1):
+            x, top, w, h = platforms.boxes[i]
+            if self.rect.colliderect((x + offset, top, w, h)):
+                if self.vel_y > 0 and self.rect.bottom <= top + 10:
+                    self.rect.bottom = top
                     self.vel_y = 0
                     self.on_ground = True
                 else:
                     self.alive = False
                     return
-        for o in obstacles:
-            if self.rect.colliderect(o.rect):
+        for i in obstacles.window(x0, x1):
+            x, top, w, h = obstacles.boxes[i]
+            if self.rect.colliderect((x + offset, top, w, h)):
                 self.alive = False
                 return
         if self.rect.bottom >= HEIGHT - GROUND_HEIGHT:
@@ -40,10 +48,10 @@ class Player:
             self.vel_y = 0
             self.on_ground = True
 
-    def update(self, platforms, obstacles):
+    def update(self, level, offset):
         if not self.alive: return
         self.apply_gravity()
-        self.handle_collisions(platforms, obstacles)
+        self.handle_collisions(level, offset)
 
     def draw(self, surf):
         color = PLAYER_COLOR if self.alive else (150, 50, 50)
@@ -62,7 +70,7 @@ class Platform:
     def draw(self, surf):
         pygame.draw.rect(surf, PLATFORM_COLOR, self.rect)
         if self.id is not None:
-            txt = FONT.render(str(self.id), True, TEXT_COLOR)
+            txt = get_font().render(str(self.id), True, TEXT_COLOR)
             text_rect = txt.get_rect(center=(self.rect.centerx, self.rect.top - 10))
             surf.blit(txt, text_rect)
 
@@ -88,7 +96,7 @@ class Obstacle:
         ]
         pygame.draw.polygon(surf, OBSTACLE_COLOR, points)
         if self.id is not None:
-            txt = FONT.render(str(self.id), True, TEXT_COLOR)
+            txt = get_font().render(str(self.id), True, TEXT_COLOR)
             text_rect = txt.get_rect(center=(self.rect.centerx, self.rect.top - 10))
             surf.blit(txt, text_rect)
 
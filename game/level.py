@@ -1,4 +1,13 @@
 # game/level.py
+from bisect import bisect_left, bisect_right
+
+import numpy as np
+
+from config import HEIGHT, GROUND_HEIGHT, PLAYER_SIZE
+
+PLATFORM_HEIGHT = 20
+LEVEL_END = 9500  # world_x au-delà duquel le niveau est terminé
+
 LEVEL_DATA = [
     # Départ: quelques petits obstacles bas
     {"id": 1,  "type": "obstacle",     "x": 600},
@@ -74,3 +83,83 @@ LEVEL_DATA = [
     {"id": 43, "type": "obstacle",     "x": 8645},
     {"id": 44, "type": "platform",     "x": 9100, "y": 320, "width": 380},
 ]
+
+
+# ============================================================================
+# NIVEAU COMPILÉ : AABB monde triées par x + recherche par fenêtre
+# ============================================================================
+
+class AABBIndex:
+    """
+    Boîtes englobantes (coordonnées monde) d'un type d'objet, triées par x.
+
+    Tableaux NumPy (x, top, w, h, ids) pour les calculs vectorisés, et
+    copies en listes Python pour le moteur scalaire (bisect + accès
+    élément par élément bien plus rapides que sur des scalaires NumPy).
+    ids vaut -1 pour un objet sans identifiant.
+    """
+
+    def __init__(self, x, top, w, h, ids):
+        order = np.argsort(np.asarray(x, dtype=np.int64), kind="stable")
+        self.x = np.asarray(x, dtype=np.int64)[order]
+        self.top = np.asarray(top, dtype=np.int64)[order]
+        self.w = np.asarray(w, dtype=np.int64)[order]
+        self.h = np.asarray(h, dtype=np.int64)[order]
+        self.ids = np.asarray(ids, dtype=np.int64)[order]
+        self.max_w = int(self.w.max()) if len(self.w) else 0
+        self.boxes = list(zip(self.x.tolist(), self.top.tolist(),
+                              self.w.tolist(), self.h.tolist()))
+        self.id_list = self.ids.tolist()
+        self._xs = self.x.tolist()
+
+    def __len__(self):
+        return len(self._xs)
+
+    def window(self, x0, x1):
+        """
+        Indices (range) des boîtes dont [x, x + w) peut recouper [x0, x1) :
+        x < x1 et x + max_w > x0. Le test exact reste à faire.
+        """
+        return range(bisect_right(self._xs, x0 - self.max_w), bisect_left(self._xs, x1))
+
+    def window_array(self, x0, x1):
+        """Même fenêtre que window, bornes en tableaux (une par partie)."""
+        return (np.searchsorted(self.x, x0 - self.max_w, side="right"),
+                np.searchsorted(self.x, x1, side="left"))
+
+
+class CompiledLevel:
+    """
+    Géométrie d'un niveau construite une seule fois à partir de LEVEL_DATA.
+
+    Les objets doivent être rangés par x croissant dans les données (c'est
+    l'ordre d'apparition utilisé par GameEngine) ; les collisions sont
+    testées dans cet ordre.
+    """
+
+    def __init__(self, level_data):
+        plat, obs = ([], [], [], [], []), ([], [], [], [], [])
+        for data in level_data:
+            if data["type"] == "platform":
+                box = (data["x"], data["y"], data["width"], PLATFORM_HEIGHT)
+                cols = plat
+            else:
+                if data["type"] == "obstacle_air":
+                    top = data["y"] - PLAYER_SIZE
+                else:
+                    top = HEIGHT - GROUND_HEIGHT - PLAYER_SIZE
+                box = (data["x"], top, PLAYER_SIZE, PLAYER_SIZE)
+                cols = obs
+            for col, value in zip(cols, box + (data.get("id", -1),)):
+                col.append(value)
+        self.platforms = AABBIndex(*plat)
+        self.obstacles = AABBIndex(*obs)
+        self.spawn_x = np.sort(np.array([d["x"] for d in level_data], dtype=np.int64))
+        self._spawn_x = self.spawn_x.tolist()
+
+    def spawned_count(self, x):
+        """Nombre d'objets apparus quand le bord droit du monde visible est en x."""
+        return bisect_right(self._spawn_x, x)
+
+
+LEVEL = CompiledLevel(LEVEL_DATA)
@@ -1,4 +1,6 @@
 # game/renderer.py
+import weakref
+
 import pygame
 from config import *
 
@@ -16,10 +18,106 @@ def render(screen, engine):
     engine.player.draw(screen)
 
     # Score
-    txt = FONT.render(f"Score : {engine.score}", True, TEXT_COLOR)
+    txt = get_font().render(f"Score : {engine.score}", True, TEXT_COLOR)
     screen.blit(txt, (10, 10))
 
     # Game Over
     if engine.game_over:
-        over_txt = FONT.render("Game Over ! Espace pour rejouer", True, TEXT_COLOR)
-        screen.blit(over_txt, (WIDTH // 2 - 200, HEIGHT // 2 - 20))
\ No newline at end of file
+        over_txt = get_font().render("Game Over ! Espace pour rejouer", True, TEXT_COLOR)
+        screen.blit(over_txt, (WIDTH // 2 - 200, HEIGHT // 2 - 20))
+
+
+class Renderer:
+    """
+    Même image que render(), au pixel près sauf les chiffres du score,
+    mais :
+    - fond + sol dessinés une fois dans une surface recopiée par zones ;
+    - textes (ids des objets, game over) rendus une seule fois puis
+      gardés en cache ;
+    - score : il augmente à chaque frame, un cache du texte complet ne
+      servirait jamais pendant une partie. "Score : " et les dizaines
+      sont rendus une fois toutes les 10 frames, le dernier chiffre est
+      un glyphe rendu une fois, posé à droite (sans crénage ni position
+      sous-pixel : un ou deux pixels d'écart avec font.render) ;
+    - seules les zones dessinées à la frame précédente sont effacées :
+      draw retourne les rects modifiés, pour pygame.display.update.
+
+    Le renderer suppose que personne d'autre ne dessine sur screen entre
+    deux appels ; sinon, appeler invalidate() (prochain draw complet).
+    """
+
+    def __init__(self, screen):
+        self.screen = screen
+        self.background = screen.copy()
+        self.background.fill(BG)
+        pygame.draw.rect(self.background, GROUND_COLOR, (0, HEIGHT - GROUND_HEIGHT, WIDTH, GROUND_HEIGHT))
+
+        font = get_font()
+        self._labels = {}
+        self._score_head = (None, None)   # (score // 10, texte rendu)
+        self._digits = [font.render(str(d), True, TEXT_COLOR) for d in range(10)]
+        self._game_over = font.render("Game Over ! Espace pour rejouer", True, TEXT_COLOR)
+        self._dirty = None    # rects dessinés à la frame précédente (None : tout)
+
+    def invalidate(self):
+        self._dirty = None
+
+    def draw(self, engine):
+        """Dessine l'état de engine et retourne la liste des rects modifiés."""
+        screen = self.screen
+        if self._dirty is None:
+            screen.blit(self.background, (0, 0))
+            cleared = [screen.get_rect()]
+        else:
+            cleared = self._dirty
+            for rect in cleared:
+                screen.blit(self.background, rect, rect)
+
+        # Mêmes primitives, dans le même ordre, que Platform.draw,
+        # Obstacle.draw, Player.draw puis render
+        drawn = []
+        level = engine.level
+        for x, top, w, h, obj_id in engine.visible_boxes(level.platforms):
+            drawn.append(pygame.draw.rect(screen, PLATFORM_COLOR, (x, top, w, h)))
+            if engine.id and obj_id >= 0:
+                drawn.append(self._blit_label(obj_id, x + w // 2, top))
+        for x, top, w, h, obj_id in engine.visible_boxes(level.obstacles):
+            points = [(x, top + h), (x + w, top + h), (x + w // 2, top)]
+            drawn.append(pygame.draw.polygon(screen, OBSTACLE_COLOR, points))
+            if engine.id and obj_id >= 0:
+                drawn.append(self._blit_label(obj_id, x + w // 2, top))
+        player = engine.player
+        color = PLAYER_COLOR if player.alive else (150, 50, 50)
+        drawn.append(pygame.draw.rect(screen, color, player.rect))
+
+        drawn.append(self._blit_score(engine.score, 10, 10))
+        if engine.game_over:
+            drawn.append(screen.blit(self._game_over, (WIDTH // 2 - 200, HEIGHT // 2 - 20)))
+
+        self._dirty = drawn
+        return cleared + drawn
+
+    def _blit_label(self, obj_id, centerx, top):
+        txt = self._labels.get(obj_id)
+        if txt is None:
+            txt = self._labels[obj_id] = get_font().render(str(obj_id), True, TEXT_COLOR)
+        return self.screen.blit(txt, txt.get_rect(center=(centerx, top - 10)))
+
+    def _blit_score(self, score, x, y):
+        head, digit = divmod(score, 10)
+        if self._score_head[0] != head:
+            text = f"Score : {head}" if head else "Score : "
+            self._score_head = (head, get_font().render(text, True, TEXT_COLOR))
+        rect = self.screen.blit(self._score_head[1], (x, y))
+        return rect.union(self.screen.blit(self._digits[digit], (rect.right, y)))
+
+
+_renderers = weakref.WeakKeyDictionary()
+
+
+def renderer_for(screen):
+    """Renderer associé à screen (créé au premier appel)."""
+    renderer = _renderers.get(screen)
+    if renderer is None:
+        renderer = _renderers[screen] = Renderer(screen)
+    return renderer
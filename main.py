@@ -1,11 +1,14 @@
+import os
 import pygame
 import sys
 import numpy as np
 from config import *
 from game.engine import GameEngine
-from game.renderer import render
-from capture.screen_capture import FrameProcessor
-from IA.DQN import init_network, forward, choose_action  # à adapter à ton fichier
+from game.renderer import Renderer
+from train import make_processor
+from IA.DQN import QNetwork, choose_action  # à adapter à ton fichier
+from IA.conv_dqn import ConvQNetwork
+from IA.checkpoint import load_checkpoint, subset
 
 pygame.init()
 screen = pygame.display.set_mode((WIDTH, HEIGHT))
@@ -13,46 +16,84 @@ pygame.display.set_caption("Geometry Dash - IA Ready")
 clock = pygame.time.Clock()
 
 engine = GameEngine()
-processor = FrameProcessor()
+renderer = Renderer(screen)
 
 # === INITIALISATION RÉSEAU (UNE FOIS) ===
-input_dim = 4 * 84 * 84
 hidden1 = 128
 hidden2 = 64
 output_dim = 2
-params = init_network(input_dim, hidden1, hidden2, output_dim)
+PARAMS_PATH = "params_dqn.ckpt"   # écrit par train.train_dqn
+if os.path.exists(PARAMS_PATH):
+    # projeté en mémoire : pas de copie ni d'unpickling au chargement ;
+    # observation et réseau sont ceux de l'entraînement (meta du checkpoint)
+    arrays, meta = load_checkpoint(PARAMS_PATH)
+    if "observation" not in meta or "network" not in meta:
+        sys.exit(f"{PARAMS_PATH} : pas d'observation / réseau dans le checkpoint "
+                 f"(écrit par train_dqn ou train_parallel attendu)")
+    processor = make_processor(meta["observation"], engine)
+    params = subset(arrays, "params")
+    if meta["network"] == "conv":
+        net = ConvQNetwork(processor.get_state_shape(), params=params)
+    else:
+        net = QNetwork.from_params(params)
+else:
+    processor = make_processor("gray", engine)
+    input_dim = int(np.prod(processor.get_state_shape()))
+    net = QNetwork(input_dim, hidden1, hidden2, output_dim)
 
 epsilon = 0.1   # pour commencer (beaucoup d’exploration)
 
+# === BOUCLE À PAS FIXE ===
+# La physique avance par pas fixes de 1/FPS s, indépendamment du rendu.
+# L'IA ne décide (capture + forward) qu'une fois toutes les FRAME_SKIP
+# étapes ; entre deux décisions l'action est répétée.
+STEP_MS = 1000 / FPS
+MAX_STEPS_PER_FRAME = 5   # évite la spirale si une frame prend trop de temps
+accumulator = 0.0
+physics_steps = 0
+rendered_step = 0         # étape de physique affichée à l'écran
+jump_pressed = False
+dirty = []                # zones de l'écran à mettre à jour
+
 running = True
 while running:
-    dt = clock.tick(FPS)
+    accumulator = min(accumulator + clock.tick(FPS), MAX_STEPS_PER_FRAME * STEP_MS)
 
     # Gestion des événements (fermeture fenêtre uniquement)
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
             running = False 
 
-    # === CAPTURE POUR IA ===
-    state = processor.process(screen)      # shape (4, 84, 84)
-    x = state.flatten()
+    while accumulator >= STEP_MS:
+        if physics_steps % FRAME_SKIP == 0:
+            # === CAPTURE POUR IA ===
+            # l'écran affiché est réutilisé s'il montre l'état courant
+            if processor.needs_pixels and rendered_step != physics_steps:
+                dirty += renderer.draw(engine)
+                rendered_step = physics_steps
+            state = processor.process(screen)      # ex. shape (4, 84, 84)
+            x = state.reshape(-1)                  # vue, sans copie
 
-    # === DÉCISION IA ===
-    q_values, _ = forward(params, x)      # shape (1, 2)
-    q_values = q_values[0]                # shape (2,)
-    action = choose_action(q_values, epsilon)
+            # === DÉCISION IA ===
+            q_values = net.forward(x)             # shape (1, 2)
+            q_values = q_values[0]                # shape (2,)
+            action = choose_action(q_values, epsilon)
 
-    # Traduction action → jump_pressed
-    jump_pressed = (action == 1)
+            # Traduction action → jump_pressed
+            jump_pressed = (action == 1)
 
-    # === UPDATE JEU ===
-    engine.update(jump_pressed, WIDTH)
+        # === UPDATE JEU ===
+        engine.update(jump_pressed, WIDTH)
+        physics_steps += 1
+        accumulator -= STEP_MS
 
     # === RENDU ===
-    render(screen, engine)
-    pygame.display.flip()
+    dirty += renderer.draw(engine)
+    rendered_step = physics_steps
+    pygame.display.update(dirty)
+    dirty.clear()
     if engine.is_done():
-        render(screen, engine)
+        dirty += renderer.draw(engine)
 
 pygame.quit()
 sys.exit()
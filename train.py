@@ -1,70 +1,293 @@
 # train.py
+import os
+import sys
 import time
 import numpy as np
 import pygame
 from config import *
 from game.engine import GameEngine
 from game.renderer import *
-from capture.screen_capture import FrameProcessor
-from IA.DQN import (
-    init_network, forward, choose_action,
-    store_transition, sample_batch,
-    compute_targets, backward, update_params
-)
-import matplotlib.pyplot as plt
-
-
-def make_env():
+from capture.semantic_rasterizer import SemanticRasterizer
+from capture.feature_observer import FeatureObserver
+from IA.DQN import QNetwork, choose_actions
+from IA.conv_dqn import ConvQNetwork
+from IA.optimizers import make_optimizer
+from IA.replay_buffer import ReplayBuffer, MemmapReplayBuffer, PrioritizedReplayBuffer
+from IA.checkpoint import save_checkpoint, load_checkpoint, CheckpointWriter, prefixed, subset
+
+
+def make_env(headless=False, observation="gray"):
+    """
+    headless    : pas de fenêtre (driver SDL "dummy" + surface hors écran)
+                  et pas de limite de FPS -> clock vaut None.
+    observation : "gray"     -> capture d'écran en niveaux de gris (4, 84, 84)
+                  "semantic" -> masques rasterisés depuis le moteur (16, 84, 84),
+                                sans rendu
+                  "features" -> petit vecteur lu dans l'état du moteur (19,),
+                                sans rendu (capture/feature_observer.py)
+                  None       -> ni rendu ni capture, processor vaut None
+    """
+    if headless:
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
     pygame.init()
-    screen = pygame.display.set_mode((WIDTH, HEIGHT))
-    pygame.display.set_caption("Geometry Dash - DQN Training")
-    clock = pygame.time.Clock()
+    if headless:
+        screen = pygame.Surface((WIDTH, HEIGHT))
+        clock = None
+    else:
+        screen = pygame.display.set_mode((WIDTH, HEIGHT))
+        pygame.display.set_caption("Geometry Dash - DQN Training")
+        clock = pygame.time.Clock()
     engine = GameEngine()
-    processor = FrameProcessor()
+    processor = make_processor(observation, engine)
     return screen, clock, engine, processor
 
 
+def make_processor(observation, engine):
+    """Processeur d'observation de engine (cf. make_env), None si observation est None."""
+    if observation == "gray":
+        # import ici : cv2 n'est chargé que pour le chemin pixels
+        from capture.screen_capture import FrameProcessor
+        return FrameProcessor()
+    if observation == "semantic":
+        return SemanticRasterizer(engine)
+    if observation == "features":
+        return FeatureObserver(engine)
+    return None
+
+
+def replay_storage(observation):
+    """
+    Stockage des frames dans le replay : uint8 pour les images (niveaux
+    de gris × 255, masques 0/1 tels quels), float32 pour les features.
+    """
+    if observation == "features":
+        return dict(dtype=np.float32, scale=1.0)
+    return dict(dtype=np.uint8, scale=255.0 if observation == "gray" else 1.0)
+
+
 def reset_env(screen, engine, processor, clock):
     engine.reset()
-    screen.fill(BG)
-    pygame.display.flip()
-    state = processor.process(screen)  # (4, 84, 84)
+    if processor is None:
+        return None
+    processor.reset()
+    if processor.needs_pixels:
+        screen.fill(BG)
+        renderer_for(screen).invalidate()
+        if clock is not None:
+            pygame.display.flip()
+    state = processor.process(screen)  # (4, 84, 84) ou (16, 84, 84)
     return state
 
 
-def step_env(screen, engine, processor, clock, action):
+def step_env(screen, engine, processor, clock, action, frame_skip=1):
+    """
+    Répète l'action pendant frame_skip étapes de physique (arrêt anticipé
+    si la partie se termine) et somme les récompenses. Rendu et capture
+    n'ont lieu qu'une fois, sur la frame de décision suivante.
+    """
     jump_pressed = (action == 1)
 
-    # Limitation FPS + mesure du temps entre frames
-    clock.tick(FPS)
+    reward = 0.0
+    done = False
+    for _ in range(frame_skip):
+        # Limitation FPS + mesure du temps entre frames (rien en headless)
+        if clock is not None:
+            clock.tick(FPS)
+
+        engine.update(jump_pressed, WIDTH)
+
+        # Récompense très simple (à ajuster)
+        done = engine.game_over
+        reward += -10.0 if done else 1.0
+        if done:
+            break
 
-    engine.update(jump_pressed, WIDTH)
-    render(screen, engine)
-    pygame.display.flip()
+    # Sans pixels : ni rendu ni capture
+    if processor is None:
+        return None, reward, done
 
-    # Récompense très simple (à ajuster)
-    reward = 1.0
-    done = engine.game_over
-    if done:
-        reward = -10.0
+    if processor.needs_pixels:
+        dirty = renderer_for(screen).draw(engine)
+        if clock is not None:
+            pygame.display.update(dirty)
 
     state = processor.process(screen)
     return state, reward, done
 
 
+
+class VectorEnv:
+    """
+    n_envs environnements avancés ensemble (headless si n_envs > 1) : les
+    observations sont rangées dans un seul tableau (n_envs, input_dim)
+    pour un forward batché du réseau.
+
+    Un environnement terminé est remis à zéro au pas suivant (son action
+    est alors ignorée) : à chaque pas, chaque environnement produit
+    exactement une observation, dans l'ordre, ce qu'attend un replay
+    créé avec n_envs.
+    """
+
+    def __init__(self, n_envs, headless=False, observation="gray"):
+        if observation is None:
+            raise ValueError("VectorEnv : observation=None ne produit pas d'états "
+                             "(\"gray\", \"semantic\" ou \"features\")")
+        headless = headless or n_envs > 1
+        self.envs = [make_env(headless=headless, observation=observation) for _ in range(n_envs)]
+        self.n_envs = n_envs
+        self.clock = self.envs[0][1]
+        self.processor = self.envs[0][3]
+        self.state_shape = self.processor.get_state_shape()
+        self.states = np.zeros((n_envs, int(np.prod(self.state_shape))), dtype=np.float32)
+        self.rewards = np.zeros(n_envs, dtype=np.float32)
+        self.dones = np.zeros(n_envs, dtype=np.bool_)
+        self.first = np.zeros(n_envs, dtype=np.bool_)   # observation = début d'épisode
+
+    def reset(self):
+        for k, (screen, clock, engine, processor) in enumerate(self.envs):
+            self.states[k] = reset_env(screen, engine, processor, clock).reshape(-1)
+        self.rewards.fill(0)
+        self.dones.fill(False)
+        self.first.fill(True)
+        return self.states
+
+    def step(self, actions, frame_skip=1):
+        """
+        Retourne (states, rewards, dones, first), tableaux réutilisés.
+        first[k] : l'environnement k vient d'être remis à zéro (pas de
+        transition ; states[k] est le premier état du nouvel épisode).
+        """
+        for k, (screen, clock, engine, processor) in enumerate(self.envs):
+            if self.dones[k]:
+                state = reset_env(screen, engine, processor, clock)
+                reward, done, first = 0.0, False, True
+            else:
+                state, reward, done = step_env(screen, engine, processor, clock,
+                                               actions[k], frame_skip)
+                first = False
+            self.states[k] = state.reshape(-1)
+            self.rewards[k] = reward
+            self.dones[k] = done
+            self.first[k] = first
+        return self.states, self.rewards, self.dones, self.first
+
+def training_state(net, target, opt, replay_buffer, rngs, scalars):
+    """
+    Etat complet de train_dqn pour un checkpoint : (tableaux, meta).
+    Le contenu du replay n'en fait pas partie (un replay sur disque se
+    reprend lui-même, cf. MemmapReplayBuffer ; en mémoire, il repart
+    vide), seulement son nombre de transitions, comparé à la reprise.
+    """
+    arrays = prefixed("params", net.params)
+    if target is not None:
+        arrays.update(prefixed("target", target.params))
+    meta = dict(scalars)
+    if opt is not None:
+        opt_arrays, meta["optimizer"] = opt.state_dict()
+        arrays.update(prefixed("opt", opt_arrays))
+    meta["rng"] = {name: gen.bit_generator.state for name, gen in rngs.items()}
+    meta["replay"] = {"num_transitions": replay_buffer.num_transitions}
+    return arrays, meta
+
+
+def restore_training_state(arrays, meta, net, target, opt, rngs):
+    """Recharge sur place un état écrit par training_state ; retourne meta."""
+    for key, value in subset(arrays, "params").items():
+        np.copyto(net.params[key], value)
+    if target is not None:
+        for key, value in subset(arrays, "target").items():
+            np.copyto(target.params[key], value)
+    if opt is not None:
+        opt.load_state_dict(subset(arrays, "opt"), meta["optimizer"])
+    for name, gen in rngs.items():
+        gen.bit_generator.state = meta["rng"][name]
+    return meta
+
+
 def train_dqn(
     num_episodes=10,
     batch_size=32,
     gamma=0.99,
     lr=1e-3,
-    save_path="params_dqn.npy"
+    save_path="params_dqn.ckpt",
+    headless=False,
+    frame_skip=FRAME_SKIP,
+    observation="gray",
+    replay_capacity=20_000,
+    replay_dir=None,
+    prioritized=False,
+    target_update=1000,
+    tau=None,
+    double=False,
+    optimizer="sgd",
+    network="dense",
+    n_envs=1,
+    checkpoint_path=None,
+    checkpoint_every=10,
 ):
-    screen, clock, engine, processor = make_env()
-
-    input_dim = 4 * 84 * 84
-    params = init_network(input_dim, 128, 64, 2)
-
-    replay_buffer = []
+    """
+    replay_dir  : dossier d'un replay sur disque (np.memmap) ; s'il contient
+                  déjà un replay (run interrompu), l'expérience est reprise.
+                  None -> replay en mémoire.
+    prioritized : replay priorisé par l'erreur TD (en mémoire, donc
+                  incompatible avec replay_dir), beta augmenté
+                  linéairement jusqu'à 1 au dernier épisode.
+    target_update : copie du réseau dans le réseau cible tous les
+                    target_update pas d'apprentissage (None -> pas de cible)
+    tau           : si fourni, moyenne de Polyak à chaque pas à la place
+    double        : cibles Double DQN (avec le réseau cible)
+    optimizer     : "sgd" (descente simple, clipping par tenseur),
+                    "adam" ou "rmsprop" (clipping sur la norme globale)
+    network       : "dense" (entrée aplatie) ou "conv" (IA/conv_dqn.py)
+    n_envs        : environnements joués en parallèle (headless si > 1) :
+                    un forward batché et un epsilon-greedy vectorisé pour
+                    tous, un pas d'apprentissage par pas des n_envs
+    save_path     : paramètres finaux (format IA/checkpoint.py, chargé
+                    sans copie par main.py)
+    checkpoint_path : état complet (réseaux, optimiseur, epsilon,
+                      générateurs, compteurs) écrit en arrière-plan tous
+                      les checkpoint_every épisodes ; si le fichier existe
+                      déjà, l'entraînement reprend depuis cet état.
+                      None -> pas de checkpoint.
+    """
+    if prioritized and replay_dir is not None:
+        raise ValueError("prioritized=True : le replay priorisé est en mémoire, "
+                         "replay_dir ne serait pas utilisé")
+    env = VectorEnv(n_envs, headless=headless, observation=observation)
+    clock, processor = env.clock, env.processor
+
+    input_dim = int(np.prod(processor.get_state_shape()))
+    if network == "conv":
+        net = ConvQNetwork(processor.get_state_shape())
+    else:
+        net = QNetwork(input_dim, 128, 64, 2)
+    use_target = target_update is not None or tau is not None
+    target = net.clone() if use_target else None
+    learn_steps = 0
+    if optimizer == "sgd":
+        opt = None
+    else:
+        opt = make_optimizer(optimizer, net.params, lr, max_norm=1.0)
+
+    # Frames stockées une seule fois (cf. replay_storage)
+    replay_args = dict(
+        capacity=replay_capacity,
+        state_shape=processor.get_state_shape(),
+        stack_size=processor.stack.stack_size,
+        n_envs=n_envs,
+        **replay_storage(observation),
+    )
+    if prioritized:
+        replay_buffer = PrioritizedReplayBuffer(**replay_args)
+        beta_start = replay_buffer.beta
+    elif replay_dir is None:
+        replay_buffer = ReplayBuffer(**replay_args)
+    else:
+        replay_buffer = MemmapReplayBuffer(replay_dir, **replay_args)
+        print(f"Replay {replay_dir} : {len(replay_buffer)} transitions reprises")
+
+    # Batchs écrits directement dans l'entrée de net.train_step
+    states_buf, next_states_buf = net.batch_buffers(batch_size)
 
     epsilon = 1.0
     epsilon_min = 0.1
@@ -76,71 +299,140 @@ def train_dqn(
     episodic_fps = []            # FPS moyen par épisode
     episodic_efficiency = []     # reward / seconde
 
-    for ep in range(num_episodes):
-        state = reset_env(screen, engine, processor, clock)
-        done = False
-        total_reward = 0.0
-
-        # métriques temporelles par épisode
-        start_time = time.time()
-        frame_count = 0
-
-        while not done:
-            # Gestion fermeture fenêtre
+    # Episodes en cours, un par environnement
+    total_rewards = np.zeros(n_envs)
+    frame_counts = np.zeros(n_envs, dtype=np.int64)
+    start_times = [time.time()] * n_envs
+    episodes_done = 0
+
+    # Les observations sont recopiées dans env.states ; le replay n'en
+    # garde que la dernière frame. Ordre d'écriture : environnement 0..K-1.
+    states = env.reset()
+    for k in range(n_envs):
+        replay_buffer.begin_episode(states[k])
+    actions = np.zeros(n_envs, dtype=np.int64)
+    rng = np.random.default_rng()
+    rngs = {"actions": rng, "replay": replay_buffer.rng}
+
+    writer = None
+    if checkpoint_path is not None:
+        if os.path.exists(checkpoint_path):
+            meta = restore_training_state(*load_checkpoint(checkpoint_path), net, target, opt, rngs)
+            epsilon = meta["epsilon"]
+            episodes_done = meta["episodes_done"]
+            learn_steps = meta["learn_steps"]
+            if prioritized:
+                replay_buffer.beta = meta["beta"]
+            print(f"Reprise de {checkpoint_path} : épisode {episodes_done}, "
+                  f"{learn_steps} pas d'apprentissage, epsilon={epsilon:.3f}")
+            saved = meta["replay"]["num_transitions"]
+            if len(replay_buffer) < saved:
+                source = ("replay en mémoire, non sauvegardé" if replay_dir is None
+                          else f"{replay_dir} plus ancien que le checkpoint")
+                print(f"Attention : {len(replay_buffer)} transitions dans le replay, "
+                      f"{saved} au checkpoint ({source})")
+        writer = CheckpointWriter(checkpoint_path)
+
+    def checkpoint_scalars():
+        scalars = {"epsilon": epsilon, "episodes_done": episodes_done, "learn_steps": learn_steps,
+                   "observation": observation, "network": network}
+        if prioritized:
+            scalars["beta"] = replay_buffer.beta
+        return scalars
+
+    while episodes_done < num_episodes:
+        # Gestion fermeture fenêtre
+        if clock is not None:
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
                     pygame.quit()
                     return
 
-            # État → Q → action
-            x = state.flatten()[None, :]           # (1, input_dim)
-            q_values, _ = forward(params, x)       # (1, 2)
-            action = choose_action(q_values[0], epsilon)
-
-            # Step env
-            next_state, reward, done = step_env(screen, engine, processor, clock, action)
-
-            # Stockage transition
-            store_transition(replay_buffer, state, action, reward, next_state, done)
-            state = next_state
-            total_reward += reward
-            frame_count += 1
-
-            # Apprentissage
-            if len(replay_buffer) >= batch_size:
-                states, actions, rewards, next_states, dones = sample_batch(replay_buffer, batch_size)
-                targets = compute_targets(params, rewards, next_states, dones, gamma)
-                q_pred, cache = forward(params, states)
-                grads = backward(params, cache, actions, targets)
-                update_params(params, grads, lr)
-
-        # Fin épisode : métriques
-        duration = time.time() - start_time
-        avg_fps = frame_count / duration if duration > 0 else 0.0
-        efficiency = total_reward / duration if duration > 0 else 0.0
-
-        episodic_rewards.append(total_reward)
-        episodic_durations.append(duration)
-        episodic_fps.append(avg_fps)
-        episodic_efficiency.append(efficiency)
-
-        epsilon = max(epsilon_min, epsilon * epsilon_decay)
-
-        print(
-            f"Episode {ep+1}/{num_episodes} | "
-            f"Reward={total_reward:.1f} | "
-            f"epsilon={epsilon:.3f} | "
-            f"frames={frame_count} | "
-            f"time={duration:.2f}s | "
-            f"FPS_moy={avg_fps:.1f} | "
-            f"reward/s={efficiency:.2f}"
-        )
+        # États → Q → actions, pour tous les environnements
+        q_values = net.forward(states)                      # (n_envs, 2)
+        choose_actions(q_values, epsilon, rng, out=actions)
+
+        # Step envs
+        states, rewards, dones, first = env.step(actions, frame_skip)
+
+        # Stockage transitions (ou début d'épisode après un reset)
+        for k in range(n_envs):
+            if first[k]:
+                replay_buffer.begin_episode(states[k])
+                start_times[k] = time.time()
+            else:
+                replay_buffer.add(actions[k], rewards[k], states[k], dones[k])
+                total_rewards[k] += rewards[k]
+                frame_counts[k] += 1
+
+        # Apprentissage
+        if len(replay_buffer) >= batch_size:
+            if prioritized:
+                *batch, weights, idx = replay_buffer.sample(batch_size, states_buf, next_states_buf)
+            else:
+                batch = replay_buffer.sample(batch_size, states_buf, next_states_buf)
+                weights = None
+            td = net.train_step(batch, gamma, lr, weights, target=target, double=double, optimizer=opt)
+            learn_steps += 1
+            if tau is not None:
+                target.sync_from(net, tau)
+            elif use_target and learn_steps % target_update == 0:
+                target.sync_from(net)
+            if prioritized:
+                replay_buffer.update_priorities(idx, td)
+
+        # Fin d'épisode : métriques
+        for k in np.flatnonzero(dones):
+            if episodes_done >= num_episodes:
+                break
+            total_reward, frame_count = float(total_rewards[k]), int(frame_counts[k])
+            duration = time.time() - start_times[k]
+            avg_fps = frame_count / duration if duration > 0 else 0.0
+            efficiency = total_reward / duration if duration > 0 else 0.0
+
+            episodic_rewards.append(total_reward)
+            episodic_durations.append(duration)
+            episodic_fps.append(avg_fps)
+            episodic_efficiency.append(efficiency)
+
+            total_rewards[k] = 0.0
+            frame_counts[k] = 0
+            episodes_done += 1
+
+            if replay_dir is not None:
+                replay_buffer.flush()
+            if prioritized:
+                replay_buffer.beta = beta_start + (1.0 - beta_start) * episodes_done / max(num_episodes - 1, 1)
+
+            epsilon = max(epsilon_min, epsilon * epsilon_decay)
+
+            # copie des tableaux ici, écriture du fichier dans un thread
+            if writer is not None and episodes_done % checkpoint_every == 0:
+                writer.submit(*training_state(net, target, opt, replay_buffer, rngs,
+                                              checkpoint_scalars()))
+
+            print(
+                f"Episode {episodes_done}/{num_episodes} | "
+                f"Reward={total_reward:.1f} | "
+                f"epsilon={epsilon:.3f} | "
+                f"frames={frame_count} | "
+                f"time={duration:.2f}s | "
+                f"FPS_moy={avg_fps:.1f} | "
+                f"reward/s={efficiency:.2f}"
+            )
 
     # === SAUVEGARDE DES PARAMS ===
-    np.save(save_path, params, allow_pickle=True)
+    if writer is not None:
+        writer.wait()
+        writer.submit(*training_state(net, target, opt, replay_buffer, rngs, checkpoint_scalars()))
+        writer.close()
+    save_checkpoint(save_path, prefixed("params", net.params),
+                    {"observation": observation, "network": network})
     print(f"Paramètres sauvegardés dans {save_path}")
 
     # === COURBES ===
+    # matplotlib (long à importer) seulement en fin d'entraînement
+    import matplotlib.pyplot as plt
     plt.figure(figsize=(10, 6))
 
     plt.subplot(2, 2, 1)
@@ -173,10 +465,11 @@ def train_dqn(
 
     plt.tight_layout()
     plt.savefig("training_metrics.png")
-    plt.show()
+    if not headless:
+        plt.show()
 
     pygame.quit()
 
 
 if __name__ == "__main__":
-    train_dqn()
+    train_dqn(headless="--headless" in sys.argv)
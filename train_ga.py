@@ -0,0 +1,227 @@
+# train_ga.py
+"""
+Entraînement par algorithme génétique (neuroévolution), cf. README
+
+Chaque génération joue population parties headless ; les meilleurs
+individus (elite, 1 = "on garde la partie allée le plus loin") sont
+conservés et la génération suivante est obtenue en les mutant.
+
+- les paramètres de toute la population sont empilés dans des tenseurs
+  (P, ...) : politique, sélection et mutation sont vectorisées ;
+- une génération est découpée en tranches évaluées en parallèle par un
+  pool de processus, chaque tranche avec un BatchGameEngine (même
+  physique que GameEngine, toutes les parties avancées d'un coup) ;
+- une partie s'arrête à la mort du joueur, la tranche dès que toutes ses
+  parties sont finies.
+
+Lancement :
+    python train_ga.py [nb_generations] [population]
+"""
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing as mp
+
+import numpy as np
+
+from config import WIDTH, OBSTACLE_SPEED, FRAME_SKIP
+from game.level import LEVEL_END
+from game.batch_engine import BatchGameEngine
+from capture.feature_observer import FeatureObserver
+from IA.checkpoint import save_checkpoint, prefixed
+
+MAX_STEPS = LEVEL_END // OBSTACLE_SPEED + 1   # pas de physique pour finir le niveau
+OBSERVER = FeatureObserver()
+NUM_FEATURES = OBSERVER.size
+
+# ============================================================
+# 1. Entrées du réseau (calculées depuis l'état du moteur)
+# ============================================================
+
+
+def batch_features(engine, out):
+    """
+    Ecrit dans out (N, NUM_FEATURES) les entrées des N parties : celles
+    de FeatureObserver (capture/feature_observer.py), les mêmes que pour
+    le DQN avec observation="features".
+    """
+    return OBSERVER.observe_batch(engine, out)
+
+
+# ============================================================
+# 2. Population : paramètres empilés (P, ...)
+# ============================================================
+#
+# Réseau d'un individu : NUM_FEATURES entrées -> hidden neurones (tanh)
+# -> 1 sortie, saut si sortie > 0. Avec hidden = 2 : les trois neurones
+# du README (bloc, pique, saut).
+
+KEYS = ("W1", "b1", "W2", "b2")
+
+
+def random_population(size, hidden=2, rng=None):
+    rng = rng if rng is not None else np.random.default_rng()
+    return {
+        "W1": rng.standard_normal((size, NUM_FEATURES, hidden), dtype=np.float32),
+        "b1": rng.standard_normal((size, hidden), dtype=np.float32),
+        "W2": rng.standard_normal((size, hidden), dtype=np.float32),
+        "b2": rng.standard_normal(size, dtype=np.float32),
+    }
+
+
+def population_size(population):
+    return len(population["b2"])
+
+
+def jump_decisions(population, features, out, hidden_buf):
+    """Sortie des P réseaux sur leurs P entrées (une partie par individu)."""
+    np.einsum("pf,pfh->ph", features, population["W1"], out=hidden_buf)
+    hidden_buf += population["b1"]
+    np.tanh(hidden_buf, out=hidden_buf)
+    q = np.einsum("ph,ph->p", hidden_buf, population["W2"])
+    q += population["b2"]
+    np.greater(q, 0, out=out)
+    return out
+
+
+def evaluate(population, frame_skip=FRAME_SKIP, max_steps=MAX_STEPS):
+    """
+    Joue une partie par individu, toutes en même temps. Fitness =
+    distance parcourue (world_x), + LEVEL_END si le niveau est fini.
+
+    Une partie finie (mort ou fin du niveau) est figée dans le moteur
+    (game_over, que BatchGameEngine.update ne fait plus avancer) : un
+    individu qui finit le niveau s'arrête au premier pas après LEVEL_END,
+    quelle que soit la durée des autres parties. La boucle s'arrête dès
+    que plus aucune ne tourne.
+    """
+    size = population_size(population)
+    engine = BatchGameEngine(size)
+    features = np.empty((size, NUM_FEATURES), dtype=np.float32)
+    hidden_buf = np.empty(population["b1"].shape, dtype=np.float32)
+    jump = np.zeros(size, dtype=bool)
+
+    steps = 0
+    while steps < max_steps:
+        jump_decisions(population, batch_features(engine, features), jump, hidden_buf)
+        for _ in range(frame_skip):
+            engine.update(jump, WIDTH)
+            engine.game_over |= engine.world_x > LEVEL_END
+        steps += frame_skip
+        if engine.is_done().all():
+            break
+
+    finished = engine.alive & (engine.world_x > LEVEL_END)
+    return engine.world_x.astype(np.float64) + LEVEL_END * finished
+
+
+# ============================================================
+# 3. Sélection et mutation vectorisées
+# ============================================================
+
+
+def next_generation(population, fitness, elite=1, sigma=0.5, rate=1.0, rng=None):
+    """
+    Garde les elite meilleurs individus (inchangés, en tête) et remplit le
+    reste de la population avec des copies mutées d'élites tirées au
+    hasard : bruit gaussien sigma sur une proportion rate des poids.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    size = population_size(population)
+    best = np.argpartition(fitness, size - elite)[size - elite:]
+    best = best[np.argsort(fitness[best])[::-1]]
+    parents = np.concatenate([best, best[rng.integers(0, elite, size - elite)]])
+
+    children = {}
+    for key in KEYS:
+        child = population[key][parents]      # copie (P, ...)
+        noise = rng.standard_normal(child[elite:].shape, dtype=np.float32)
+        noise *= sigma
+        if rate < 1.0:
+            noise *= rng.random(noise.shape) < rate
+        child[elite:] += noise
+        children[key] = child
+    return children
+
+
+def best_individual(population, fitness):
+    """Paramètres du meilleur individu (dictionnaire sans l'axe P)."""
+    i = int(np.argmax(fitness))
+    return {key: population[key][i].copy() for key in KEYS}
+
+
+# ============================================================
+# 4. Boucle d'entraînement
+# ============================================================
+
+
+def _slices(size, parts):
+    bounds = np.linspace(0, size, parts + 1).astype(int)
+    return [slice(a, b) for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+
+
+def train_ga(
+    num_generations=50,
+    population=1000,
+    hidden=2,
+    elite=1,
+    sigma=0.5,
+    rate=1.0,
+    frame_skip=FRAME_SKIP,
+    workers=None,
+    seed=None,
+    save_path="params_ga.ckpt",
+):
+    """
+    workers : processus d'évaluation (défaut : nombre de coeurs). Avec 1,
+              tout est évalué dans le processus principal, sans pool.
+    """
+    rng = np.random.default_rng(seed)
+    workers = workers or os.cpu_count()
+    pop = random_population(population, hidden, rng)
+
+    pool = None
+    if workers > 1:
+        pool = ProcessPoolExecutor(workers, mp_context=mp.get_context("spawn"))
+
+    history = []
+    best_params = None
+    best_fitness = -np.inf
+    try:
+        for generation in range(1, num_generations + 1):
+            start_time = time.time()
+            if pool is None:
+                fitness = evaluate(pop, frame_skip)
+            else:
+                parts = _slices(population, workers)
+                chunks = [{key: pop[key][s] for key in KEYS} for s in parts]
+                fitness = np.concatenate(list(pool.map(evaluate, chunks, [frame_skip] * len(chunks))))
+
+            if fitness.max() > best_fitness:
+                best_fitness = float(fitness.max())
+                best_params = best_individual(pop, fitness)
+            history.append((fitness.max(), fitness.mean()))
+            print(
+                f"Génération {generation}/{num_generations} | "
+                f"meilleur={fitness.max():.0f} | "
+                f"moyenne={fitness.mean():.0f} | "
+                f"niveau fini={(fitness > LEVEL_END).sum()} | "
+                f"time={time.time() - start_time:.2f}s"
+            )
+            if generation < num_generations:
+                pop = next_generation(pop, fitness, elite, sigma, rate, rng)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    save_checkpoint(save_path, prefixed("params", best_params), {"fitness": best_fitness})
+    print(f"Meilleur individu ({best_fitness:.0f}) sauvegardé dans {save_path}")
+    return best_params, history
+
+
+if __name__ == "__main__":
+    train_ga(
+        num_generations=int(sys.argv[1]) if len(sys.argv) > 1 else 50,
+        population=int(sys.argv[2]) if len(sys.argv) > 2 else 1000,
+    )
@@ -0,0 +1,283 @@
+# train_parallel.py
+"""
+Entraînement DQN acteurs / learner multiprocessus
+
+- N processus acteurs : chacun joue une partie headless (GameEngine +
+  processor), choisit ses actions avec sa copie locale du réseau et
+  écrit ses transitions dans son propre replay en mémoire partagée ;
+- le processus principal (learner) tire des batchs dans l'ensemble des
+  replays et enchaîne les pas d'apprentissage sans attendre le jeu ;
+- les paramètres sont diffusés aux acteurs par un bloc de mémoire
+  partagée, relu périodiquement par chaque acteur.
+
+Lancement :
+    python train_parallel.py [nb_acteurs]
+"""
+import os
+import sys
+import time
+import queue
+import multiprocessing as mp
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from config import FRAME_SKIP
+from IA.DQN import QNetwork, choose_action
+from IA.conv_dqn import ConvQNetwork
+from IA.optimizers import make_optimizer
+from IA.replay_buffer import SharedReplayBuffer, ShardedReplay
+from IA.checkpoint import save_checkpoint, prefixed
+
+
+class ParamBroadcast:
+    """
+    Paramètres d'un réseau dans un bloc de mémoire partagée, protégés par
+    un compteur de version (seqlock) : impair pendant une écriture,
+    pair ensuite. Un lecteur qui voit la version changer pendant sa copie
+    l'abandonne et réessaiera au prochain pull.
+    """
+
+    def __init__(self, params, name, create=True):
+        self.name = name
+        self.create = create
+        self.layout = []
+        offset = 0
+        for key, value in params.items():
+            self.layout.append((key, value.shape, offset))
+            offset += value.size
+        size = 8 + 4 * offset
+        self._shm = shared_memory.SharedMemory(name, create=create, size=size)
+        self._version = np.ndarray((1,), dtype=np.int64, buffer=self._shm.buf)
+        self._data = np.ndarray((offset,), dtype=np.float32, buffer=self._shm.buf, offset=8)
+        self.views = {key: self._data[start:start + int(np.prod(shape))].reshape(shape)
+                      for key, shape, start in self.layout}
+        self._scratch = None   # buffers de lecture de pull
+        if create:
+            self._version[0] = 0
+
+    def spec(self):
+        return {"name": self.name,
+                "shapes": {key: shape for key, shape, _ in self.layout}}
+
+    @classmethod
+    def attach(cls, spec):
+        params = {key: np.empty(shape, dtype=np.float32) for key, shape in spec["shapes"].items()}
+        return cls(params, spec["name"], create=False)
+
+    def version(self):
+        return int(self._version[0])
+
+    def publish(self, params):
+        self._version[0] += 1
+        for key, view in self.views.items():
+            np.copyto(view, params[key])
+        self._version[0] += 1
+
+    def pull(self, params, last_version):
+        """
+        Copie les paramètres publiés dans params s'ils sont plus récents
+        que last_version. Retourne la version effectivement chargée.
+        La lecture passe par des buffers intermédiaires : une copie
+        déchirée (publish pendant la lecture) ne touche pas params.
+        """
+        version = self.version()
+        if version == last_version or version % 2:
+            return last_version
+        if self._scratch is None:
+            self._scratch = {key: np.empty_like(view) for key, view in self.views.items()}
+        for key, view in self.views.items():
+            np.copyto(self._scratch[key], view)
+        if self.version() != version:
+            return last_version
+        for key, value in self._scratch.items():
+            np.copyto(params[key], value)
+        return version
+
+    def close(self):
+        self._version = self._data = self.views = None
+        self._shm.close()
+        if self.create:
+            self._shm.unlink()
+
+
+def make_network(network, state_shape):
+    if network == "conv":
+        return ConvQNetwork(state_shape)
+    return QNetwork(int(np.prod(state_shape)), 128, 64, 2)
+
+
+def run_actor(actor_id, config, replay_spec, param_spec, stop, episodes):
+    """Processus acteur : joue jusqu'à stop, en relisant les paramètres publiés."""
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    from train import make_env, reset_env, step_env
+
+    screen, clock, engine, processor = make_env(headless=True, observation=config["observation"])
+    replay = SharedReplayBuffer.attach(replay_spec, seed=config["seed"] + actor_id)
+    broadcast = ParamBroadcast.attach(param_spec)
+    net = make_network(config["network"], processor.get_state_shape())
+    version = broadcast.pull(net.params, -1)
+    epsilon = config["epsilons"][actor_id]
+
+    steps = 0
+    try:
+        while not stop.is_set():
+            state = reset_env(screen, engine, processor, clock)
+            replay.begin_episode(state)
+            done = False
+            total_reward = 0.0
+            frame_count = 0
+            start_time = time.time()
+            while not done and not stop.is_set():
+                q_values = net.forward(state.reshape(1, -1))
+                action = choose_action(q_values[0], epsilon)
+                state, reward, done = step_env(screen, engine, processor, clock,
+                                               action, config["frame_skip"])
+                replay.add(action, reward, state, done)
+                total_reward += reward
+                frame_count += 1
+                steps += 1
+                if steps % config["sync_every"] == 0:
+                    version = broadcast.pull(net.params, version)
+            if done:
+                episodes.put((actor_id, total_reward, frame_count, time.time() - start_time))
+    finally:
+        replay.close()
+        broadcast.close()
+
+
+def train_parallel(
+    num_actors=4,
+    num_episodes=100,
+    batch_size=32,
+    gamma=0.99,
+    lr=1e-3,
+    save_path="params_dqn.ckpt",
+    frame_skip=FRAME_SKIP,
+    observation="gray",
+    replay_capacity=100_000,
+    target_update=1000,
+    double=False,
+    optimizer="sgd",
+    network="dense",
+    publish_every=50,
+    sync_every=100,
+):
+    """
+    num_actors    : processus acteurs (un coeur chacun), le learner prend
+                    le processus principal
+    replay_capacity : capacité totale, répartie entre les acteurs
+    publish_every : pas d'apprentissage entre deux diffusions des paramètres
+    sync_every    : pas de jeu entre deux relectures côté acteur
+
+    Epsilon fixe par acteur, de 0.4 à 0.4^8 (répartition d'Ape-X) : pas
+    de décroissance, l'exploration vient des acteurs les plus bruités.
+    """
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    from train import make_env, replay_storage
+
+    _, _, _, processor = make_env(headless=True, observation=observation)
+    state_shape = processor.get_state_shape()
+
+    net = make_network(network, state_shape)
+    target = net.clone() if target_update is not None else None
+    opt = None if optimizer == "sgd" else make_optimizer(optimizer, net.params, lr, max_norm=1.0)
+    states_buf, next_states_buf = net.batch_buffers(batch_size)
+
+    prefix = f"gd{os.getpid()}"
+    shards = [
+        SharedReplayBuffer(f"{prefix}_r{i}", replay_capacity // num_actors, state_shape,
+                           stack_size=processor.stack.stack_size,
+                           **replay_storage(observation))
+        for i in range(num_actors)
+    ]
+    replay = ShardedReplay(shards)
+    broadcast = ParamBroadcast(net.params, f"{prefix}_params")
+    broadcast.publish(net.params)
+
+    config = {
+        "observation": observation,
+        "frame_skip": frame_skip,
+        "network": network,
+        "sync_every": sync_every,
+        "seed": int(np.random.default_rng().integers(1 << 31)),
+        "epsilons": [0.4 ** (1 + 7 * i / max(num_actors - 1, 1)) for i in range(num_actors)],
+    }
+    ctx = mp.get_context("spawn")
+    stop = ctx.Event()
+    episodes = ctx.Queue()
+
+    # Un thread BLAS par acteur (hérité à la création des processus) :
+    # les coeurs restants vont au learner.
+    blas_env = {k: os.environ.get(k) for k in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS")}
+    for k in blas_env:
+        os.environ[k] = "1"
+    actors = [ctx.Process(target=run_actor,
+                          args=(i, config, shards[i].spec(), broadcast.spec(), stop, episodes),
+                          daemon=True)
+              for i in range(num_actors)]
+    for actor in actors:
+        actor.start()
+    for k, v in blas_env.items():
+        if v is None:
+            del os.environ[k]
+        else:
+            os.environ[k] = v
+
+    episodes_done = 0
+    learn_steps = 0
+    start_time = time.time()
+    try:
+        while episodes_done < num_episodes:
+            # Apprentissage continu dès qu'il y a assez de transitions
+            if len(replay) >= batch_size:
+                batch = replay.sample(batch_size, states_buf, next_states_buf)
+                net.train_step(batch, gamma, lr, target=target, double=double, optimizer=opt)
+                learn_steps += 1
+                if target is not None and learn_steps % target_update == 0:
+                    target.sync_from(net)
+                if learn_steps % publish_every == 0:
+                    broadcast.publish(net.params)
+            else:
+                time.sleep(0.01)
+
+            # Episodes terminés par les acteurs
+            while episodes_done < num_episodes:
+                try:
+                    actor_id, total_reward, frame_count, duration = episodes.get_nowait()
+                except queue.Empty:
+                    break
+                episodes_done += 1
+                print(
+                    f"Episode {episodes_done}/{num_episodes} | "
+                    f"acteur {actor_id} | "
+                    f"Reward={total_reward:.1f} | "
+                    f"frames={frame_count} | "
+                    f"time={duration:.2f}s | "
+                    f"transitions={len(replay)} | "
+                    f"pas learner={learn_steps} ({learn_steps / (time.time() - start_time):.1f}/s)"
+                )
+
+            # Sans acteurs, plus aucun épisode n'arrive : le learner
+            # tournerait sans fin sur un replay figé
+            failed = [i for i, actor in enumerate(actors) if actor.exitcode not in (None, 0)]
+            if failed or not any(actor.is_alive() for actor in actors):
+                codes = ", ".join(f"{i} ({actors[i].exitcode})" for i in failed)
+                raise RuntimeError(f"acteurs arrêtés avant la fin de l'entraînement : {codes or 'tous'}")
+    finally:
+        stop.set()
+        for actor in actors:
+            actor.join(timeout=10)
+            if actor.is_alive():
+                actor.terminate()
+        for shard in shards:
+            shard.close()
+        broadcast.close()
+
+    save_checkpoint(save_path, prefixed("params", net.params),
+                    {"observation": observation, "network": network})
+    print(f"Paramètres sauvegardés dans {save_path}")
+
+
+if __name__ == "__main__":
+    train_parallel(num_actors=int(sys.argv[1]) if len(sys.argv) > 1 else os.cpu_count() - 1)